@@ -6,12 +6,40 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'simulator.settings')
 django.setup()
 
-from quiz.models import Question
-import PyPDF2
-import re
+from quiz.extraction import count_pages, iter_pages
+from quiz.ingest import DEFAULT_BATCH_SIZE, replace_questions, sync_questions
+from quiz.parsing import QuestionParser, parse_pages, source_name
+from quiz.profiling import ImportProfile
+import argparse
 
 pdf_path = os.path.join(os.path.dirname(__file__), 'simulator', 'questions.pdf')
 
+arg_parser = argparse.ArgumentParser(description='Load questions from the bundled PDF')
+arg_parser.add_argument('--incremental', action='store_true',
+                        help='Only insert, update or delete questions whose content changed')
+arg_parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help='Number of questions written per INSERT statement')
+arg_parser.add_argument('--no-cache', action='store_true',
+                        help='Extract page text from the PDF even if a cached copy exists')
+arg_parser.add_argument('--profile', metavar='PATH',
+                        help="Write per-stage timings and counts as JSON to PATH ('-' for stdout)")
+arg_parser.add_argument('--cprofile', metavar='PATH',
+                        help='With --profile, also dump cProfile stats of the import to PATH')
+args = arg_parser.parse_args()
+
+
+def report_pages(pages):
+    for page_num, page_text in pages:
+        print(f'Extracted page {page_num}')
+        yield page_num, page_text
+
+
+def report_questions(questions):
+    for q_data in questions:
+        print(f'✓ Parsed Question #{q_data["question_number"]}')
+        yield q_data
+
+
 print(f'Reading PDF from: {pdf_path}')
 
 if not os.path.exists(pdf_path):
@@ -19,144 +47,34 @@ if not os.path.exists(pdf_path):
     sys.exit(1)
 
 try:
-    with open(pdf_path, 'rb') as file:
-        pdf_reader = PyPDF2.PdfReader(file)
-        full_text = ""
-        
-        print(f'Total pages in PDF: {len(pdf_reader.pages)}')
-        
-        for page_num, page in enumerate(pdf_reader.pages):
-            page_text = page.extract_text()
-            full_text += page_text + "\n"
-            print(f'Extracted page {page_num + 1}')
-
-    print('\n' + '='*60)
-    print('PDF read successfully. Parsing questions...')
-    print('='*60 + '\n')
+    print(f'Total pages in PDF: {count_pages(pdf_path)}')
     
-    full_text = re.sub(r'www\.crystal\.consulting', '', full_text, flags=re.IGNORECASE)
+    profile = ImportProfile(enabled=bool(args.profile), cprofile_path=args.cprofile)
+    profile.start()
+    pages = report_pages(iter_pages(pdf_path, cache=not args.no_cache))
+    questions = report_questions(parse_pages(pages, QuestionParser(source=source_name(pdf_path)), profile))
+    sources = [source_name(pdf_path)]
     
-    question_blocks = re.split(r'\*{3,}', full_text)
-    
-    questions_data = []
-    
-    for block_idx, block in enumerate(question_blocks):
-        block = block.strip()
-        if not block or len(block) < 30:
-            continue
-        
-        lines = block.split('\n')
-        lines = [line.strip() for line in lines if line.strip()]
-        
-        lines = [line for line in lines if not re.match(r'^Page\s+\d+', line, re.IGNORECASE)]
-        
-        if not lines:
-            continue
-        
-        question_text_parts = []
-        option_a = ""
-        option_b = ""
-        option_c = ""
-        option_d = ""
-        correct_option = ""
-        explanation = ""
-        
-        found_options = False
-        collecting_explanation = False
-        
-        for i, line in enumerate(lines):
-            if re.match(r'^ECO\s+Domain\s+Task\s*:', line, re.IGNORECASE):
-                break
-            
-            if re.match(r'^A\s*:\s*', line, re.IGNORECASE):
-                found_options = True
-                option_a = re.sub(r'^A\s*:\s*', '', line, flags=re.IGNORECASE).strip()
-                continue
-            
-            if re.match(r'^B\s*:\s*', line, re.IGNORECASE):
-                option_b = re.sub(r'^B\s*:\s*', '', line, flags=re.IGNORECASE).strip()
-                continue
-            
-            if re.match(r'^C\s*:\s*', line, re.IGNORECASE):
-                option_c = re.sub(r'^C\s*:\s*', '', line, flags=re.IGNORECASE).strip()
-                continue
-            
-            if re.match(r'^D\s*:\s*', line, re.IGNORECASE):
-                option_d = re.sub(r'^D\s*:\s*', '', line, flags=re.IGNORECASE).strip()
-                continue
-            
-            if re.match(r'^Correct\s*Answer\s*:', line, re.IGNORECASE):
-                answer_text = re.sub(r'^Correct\s*Answer\s*:\s*', '', line, flags=re.IGNORECASE).strip()
-                answer_match = re.search(r'([A-Da-d])', answer_text)
-                if answer_match:
-                    correct_option = answer_match.group(1).upper()
-                continue
-            
-            if re.match(r'^Explanation\s*:', line, re.IGNORECASE):
-                collecting_explanation = True
-                explanation = re.sub(r'^Explanation\s*:\s*', '', line, flags=re.IGNORECASE).strip()
-                continue
-            
-            if collecting_explanation and not re.match(r'^ECO\s+Domain\s+Task\s*:', line, re.IGNORECASE):
-                explanation += ' ' + line
-            elif not found_options:
-                question_text_parts.append(line)
-        
-        question_text = ' '.join(question_text_parts).strip()
-        question_text = re.sub(r'\s+', ' ', question_text)
-        
-        option_a = re.sub(r'\s+', ' ', option_a).strip()
-        option_b = re.sub(r'\s+', ' ', option_b).strip()
-        option_c = re.sub(r'\s+', ' ', option_c).strip()
-        option_d = re.sub(r'\s+', ' ', option_d).strip()
-        explanation = re.sub(r'\s+', ' ', explanation).strip()
-        
-        if not question_text or not all([option_a, option_b, option_c, option_d]):
-            continue
-        
-        if not correct_option:
-            correct_option = 'A'
-        
-        if not explanation:
-            explanation = "No explanation provided."
-        
-        q_num_match = re.search(r'^\d+', question_text)
-        if q_num_match:
-            question_number = int(q_num_match.group())
-            question_text = re.sub(r'^\d+[\.\s]*', '', question_text).strip()
+    with profile.stage('write'):
+        if args.incremental:
+            summary = sync_questions(questions, sources=sources, batch_size=args.batch_size)
         else:
-            question_number = len(questions_data) + 1
-        
-        questions_data.append({
-            'question_number': question_number,
-            'question_text': question_text,
-            'option_a': option_a,
-            'option_b': option_b,
-            'option_c': option_c,
-            'option_d': option_d,
-            'correct_option': correct_option,
-            'explanation': explanation
-        })
-        
-        print(f'✓ Parsed Question #{question_number}')
-    
-    print(f'\n{"="*60}')
-    print(f'Total questions parsed: {len(questions_data)}')
-    print(f'{"="*60}\n')
+            summary = replace_questions(questions, sources=sources, batch_size=args.batch_size)
+    profile.stop()
+    profile.add_summary(summary)
+    if args.profile:
+        profile.write(args.profile)
     
-    if len(questions_data) == 0:
+    if summary['parsed'] == 0:
         print('ERROR: No questions were parsed. Please check the PDF format.')
         sys.exit(1)
     
-    Question.objects.all().delete()
-    print('Deleted existing questions from database\n')
-    
-    for q_data in questions_data:
-        Question.objects.create(**q_data)
-        print(f'Saved Question #{q_data["question_number"]} to database')
-    
     print(f'\n{"="*60}')
-    print(f'✓ SUCCESS: Loaded {len(questions_data)} questions into database!')
+    print(f'✓ SUCCESS: Loaded {summary["parsed"]} questions into database!')
+    print(f'  {summary["created"]} created, {summary["updated"]} updated, '
+          f'{summary["deleted"]} deleted, {summary["unchanged"]} unchanged, '
+          f'{summary["duplicates"]} duplicates skipped')
+    print(f'  Wrote {summary["rows_per_second"]:.0f} rows/second')
     print(f'{"="*60}')
     
 except Exception as e:
@@ -1,12 +1,34 @@
 from django.contrib import admin
-from .models import Question, QuizSession
+from .bank import bank_changed
+from .models import Answer, ImportCheckpoint, Question, QuizSession
 
 
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
-    list_display = ['question_number', 'question_text', 'correct_option']
+    list_display = ['question_number', 'source', 'question_text', 'correct_option']
     search_fields = ['question_text']
-    list_filter = ['correct_option']
+    list_filter = ['source', 'correct_option']
+
+    # Workers serve questions from quiz.bank, so edits here must bump its version.
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        bank_changed()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        bank_changed()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        bank_changed()
+
+
+class AnswerInline(admin.TabularInline):
+    model = Answer
+    fields = ['question', 'option', 'answered_at']
+    readonly_fields = ['answered_at']
+    raw_id_fields = ['question']
+    extra = 0
 
 
 @admin.register(QuizSession)
@@ -14,3 +36,10 @@ class QuizSessionAdmin(admin.ModelAdmin):
     list_display = ['id', 'start_time', 'end_time', 'score', 'is_completed']
     list_filter = ['is_completed', 'start_time']
     readonly_fields = ['start_time', 'end_time', 'score']
+    inlines = [AnswerInline]
+
+
+@admin.register(ImportCheckpoint)
+class ImportCheckpointAdmin(admin.ModelAdmin):
+    list_display = ['source', 'first_page', 'last_page', 'next_page', 'questions_written', 'is_completed', 'updated_at']
+    list_filter = ['source', 'is_completed']
@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class QuizConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'quiz'
+
+    def ready(self):
+        from .sqlite import apply_pragmas
+
+        connection_created.connect(apply_pragmas, dispatch_uid='quiz.sqlite.apply_pragmas')
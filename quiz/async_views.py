@@ -0,0 +1,160 @@
+"""
+Async versions of the views candidates hit throughout an exam, used instead
+of ``quiz.views`` when ``QUIZ_ASYNC_VIEWS`` is on and the site is served
+over ASGI. A sync view holds one of the server's threads for the whole
+request; these only leave the event loop for the queries themselves, and
+with ``QUIZ_STATE_IN_SESSION`` question pages don't leave it at all.
+"""
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError
+from django.http import Http404, JsonResponse
+from django.shortcuts import render, redirect
+from .bank import aget_bank
+from .models import QuizSession
+# Starting a quiz happens once per candidate, so those views stay sync; the
+# rest share their context and payload building with the sync views.
+from .views import (  # noqa: F401
+    begin_quiz, exam_error, exam_payload, explanation_context, question_context, question_redirect, read_changes,
+    render_conditional, results_context, seconds_remaining, start_quiz,
+)
+from . import state
+import json
+
+
+async def quiz_question(request, question_index):
+    quiz_session = await state.aget_quiz_session(request)
+
+    response = question_redirect(quiz_session, question_index)
+    if response is not None:
+        return response
+
+    time_remaining = seconds_remaining(quiz_session)
+
+    if time_remaining <= 0:
+        await state.acomplete(request, quiz_session)
+        return redirect('quiz_results')
+
+    question_id = quiz_session.get_selected_questions()[question_index]
+    if isinstance(quiz_session, QuizSession):
+        selected_answer = await sync_to_async(quiz_session.get_user_answer)(question_id)
+    else:
+        selected_answer = quiz_session.get_user_answer(question_id)
+    context = question_context(quiz_session, question_index, await aget_bank(), selected_answer, time_remaining)
+
+    return render(request, 'quiz/question.html', context)
+
+
+async def exam_data(request):
+    quiz_session = await state.aget_quiz_session(request)
+
+    response = exam_error(quiz_session)
+    if response is not None:
+        return response
+
+    if isinstance(quiz_session, QuizSession):
+        answers = await sync_to_async(quiz_session.get_user_answers)()
+    else:
+        answers = quiz_session.get_user_answers()
+
+    return JsonResponse(exam_payload(quiz_session, await aget_bank(), answers))
+
+
+async def save_answer(request):
+    if request.method == 'POST':
+        quiz_session_id = await request.session.aget('quiz_session_id')
+
+        if not quiz_session_id:
+            return JsonResponse({'error': 'No active quiz session'}, status=400)
+
+        data = json.loads(request.body)
+        question_id = data.get('question_id')
+        answer = data.get('answer')
+
+        if question_id and answer in ('A', 'B', 'C', 'D'):
+            try:
+                await state.arecord_answer(request, quiz_session_id, question_id, answer)
+            except QuizSession.DoesNotExist:
+                return JsonResponse({'error': 'No active quiz session'}, status=400)
+            except (IntegrityError, TypeError, ValueError):
+                # Unknown question id.
+                return JsonResponse({'error': 'Invalid data'}, status=400)
+            return JsonResponse({'status': 'success'})
+
+        return JsonResponse({'error': 'Invalid data'}, status=400)
+
+    return JsonResponse({'error': 'Invalid request'}, status=400)
+
+
+async def save_answers(request):
+    if request.method == 'POST':
+        quiz_session_id = await request.session.aget('quiz_session_id')
+
+        if not quiz_session_id:
+            return JsonResponse({'error': 'No active quiz session'}, status=400)
+
+        changes = read_changes(request)
+        if changes is None:
+            return JsonResponse({'error': 'Invalid data'}, status=400)
+
+        try:
+            saved = await state.arecord_changes(request, quiz_session_id, changes)
+        except QuizSession.DoesNotExist:
+            return JsonResponse({'error': 'No active quiz session'}, status=400)
+        except IntegrityError:
+            return JsonResponse({'error': 'Invalid data'}, status=400)
+        return JsonResponse({'status': 'success', 'saved': saved})
+
+    return JsonResponse({'error': 'Invalid request'}, status=400)
+
+
+async def submit_quiz(request):
+    quiz_session = await state.aget_quiz_session(request)
+
+    if quiz_session is None:
+        return redirect('start_quiz')
+
+    await state.acomplete(request, quiz_session)
+
+    return redirect('quiz_results')
+
+
+async def aget_stored_session(request):
+    quiz_session_id = await request.session.aget('quiz_session_id')
+    if not quiz_session_id:
+        return None
+    try:
+        return await QuizSession.objects.aget(id=quiz_session_id)
+    except QuizSession.DoesNotExist:
+        raise Http404('No QuizSession matches the given query.')
+
+
+async def quiz_results(request):
+    quiz_session = await aget_stored_session(request)
+
+    if quiz_session is None:
+        return redirect('start_quiz')
+
+    if not quiz_session.is_completed:
+        return redirect('quiz_question', question_index=0)
+
+    return render_conditional(
+        request, 'quiz/results.html', lambda: results_context(quiz_session),
+        quiz_session.id, quiz_session.end_time,
+    )
+
+
+async def quiz_explanation(request):
+    quiz_session = await aget_stored_session(request)
+
+    if quiz_session is None:
+        return redirect('start_quiz')
+
+    if not quiz_session.is_completed:
+        return redirect('quiz_question', question_index=0)
+
+    # Completed sessions always have their graded slots, so this never queries.
+    bank = await aget_bank()
+    return render_conditional(
+        request, 'quiz/explanation.html', lambda: explanation_context(quiz_session, bank),
+        f'{quiz_session.id}-{bank.version}', quiz_session.end_time,
+    )
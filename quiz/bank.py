@@ -0,0 +1,161 @@
+"""
+In-process, read-only snapshot of the question bank.
+
+The bank only changes when it is imported, so each worker process loads it
+once into compact per-question records indexed by id and serves question
+pages, grading and results from memory. Importers bump
+``QuestionBankVersion``; workers compare it with their snapshot at most
+every ``QUESTION_BANK_CHECK_SECONDS`` and reload lazily when it changed.
+
+The snapshot also serves as the id index exams are drawn from: question
+ids grouped by source bank, so assembling an exam costs the same however
+large the bank is.
+"""
+from collections import namedtuple
+import random
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+
+from . import bank_db
+from .models import Question, QuestionBankVersion
+
+
+QuestionRecord = namedtuple('QuestionRecord', [
+    'id', 'source', 'question_number', 'question_text',
+    'option_a', 'option_b', 'option_c', 'option_d',
+    'correct_option', 'explanation',
+])
+
+
+class BankSnapshot:
+
+    def __init__(self, version, records):
+        self.version = version
+        self.records = records
+        # Question ids in exam order.
+        self.ordered_ids = [
+            record.id for record in sorted(records.values(), key=lambda record: (record.question_number, record.id))
+        ]
+        self.ids_by_source = {}
+        for question_id in self.ordered_ids:
+            self.ids_by_source.setdefault(records[question_id].source, []).append(question_id)
+
+    @classmethod
+    def load(cls, version):
+        questions = Question.objects.order_by()
+        if bank_db.is_available():
+            # Read the copy's own version, so a copy not yet republished is
+            # simply reloaded at the next check.
+            bank_db.reconnect()
+            version = bank_db.published_version()
+            questions = questions.using(bank_db.BANK_DB)
+        records = {row[0]: QuestionRecord(*row) for row in questions.values_list(*QuestionRecord._fields)}
+        return cls(version, records)
+
+    def __len__(self):
+        return len(self.records)
+
+    def get(self, question_id):
+        return self.records.get(question_id)
+
+    def questions(self, question_ids):
+        """Records for ``question_ids`` that still exist, ordered by question number."""
+        records = [self.records[question_id] for question_id in question_ids if question_id in self.records]
+        records.sort(key=lambda record: record.question_number)
+        return records
+
+    def correct_option(self, question_id):
+        record = self.records.get(question_id)
+        return record.correct_option if record else None
+
+    def sample(self, length, rng, stratify=True):
+        """
+        Draw ``length`` distinct question ids in a random order. With
+        ``stratify`` each source bank contributes in proportion to its size.
+        """
+        if not stratify:
+            picked = rng.sample(self.ordered_ids, length)
+        else:
+            picked = []
+            for source, count in self._allocate(length):
+                picked.extend(rng.sample(self.ids_by_source[source], count))
+            rng.shuffle(picked)
+        return picked
+
+    def _allocate(self, length):
+        # Largest remainder: floor of each bank's share, then the leftover
+        # questions to the banks with the biggest fractions.
+        total = len(self.ordered_ids)
+        shares = [(source, length * len(ids) / total) for source, ids in sorted(self.ids_by_source.items())]
+        counts = {source: int(share) for source, share in shares}
+        leftover = length - sum(counts.values())
+        for source, share in sorted(shares, key=lambda item: int(item[1]) - item[1])[:leftover]:
+            counts[source] += 1
+        return [(source, count) for source, count in counts.items() if count]
+
+
+_snapshot = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def get_bank():
+    """Return this process's snapshot, reloading it if the bank has changed."""
+    global _snapshot, _checked_at
+
+    now = time.monotonic()
+    if _snapshot is not None and now - _checked_at < settings.QUESTION_BANK_CHECK_SECONDS:
+        return _snapshot
+
+    with _lock:
+        if _snapshot is None or now - _checked_at >= settings.QUESTION_BANK_CHECK_SECONDS:
+            version = QuestionBankVersion.current()
+            if _snapshot is None or _snapshot.version != version:
+                _snapshot = BankSnapshot.load(version)
+            _checked_at = now
+    return _snapshot
+
+
+async def aget_bank():
+    """``get_bank`` for async views; only leaves the event loop when a check is due."""
+    if _snapshot is not None and time.monotonic() - _checked_at < settings.QUESTION_BANK_CHECK_SECONDS:
+        return _snapshot
+    return await sync_to_async(get_bank)()
+
+
+def bank_changed():
+    """Called by anything that writes questions; other workers notice on their next check."""
+    global _checked_at
+
+    QuestionBankVersion.bump()
+    # This process can reload straight away.
+    _checked_at = 0.0
+    if bank_db.enabled():
+        transaction.on_commit(publish_bank)
+
+
+def publish_bank():
+    global _checked_at
+
+    bank_db.publish()
+    _checked_at = 0.0
+
+
+def assemble_exam(length=None, seed=None):
+    """
+    Pick the questions for a new exam from the current bank and return
+    ``(question_ids, seed)``; the same seed and bank always give the same
+    exam. Raises ValueError if the bank has fewer than ``length`` questions.
+    """
+    length = settings.QUIZ_LENGTH if length is None else length
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(63)
+
+    bank = get_bank()
+    if len(bank) < length:
+        raise ValueError(f'The question bank has {len(bank)} questions; an exam needs {length}')
+    return bank.sample(length, random.Random(seed), stratify=settings.QUIZ_STRATIFY_BY_SOURCE), seed
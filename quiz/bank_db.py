@@ -0,0 +1,75 @@
+"""
+Read-only copy of the question bank in its own SQLite file.
+
+With ``QUESTION_BANK_SEPARATE`` question reads go to the ``bank`` database
+(see ``quiz.routers``), opened read-only and immutable, so they never take
+a lock or wait behind the quiz-session writes on the default database.
+Question writes still go to the default database, where answers reference
+them. After every commit that changes the bank, ``publish`` copies the
+question table into a new file and renames it over
+``QUESTION_BANK_DATABASE``. Connections already open keep reading the file
+they opened, so a reader only sees a complete bank: the old one or the new one.
+"""
+from contextlib import closing
+from pathlib import Path
+import os
+import sqlite3
+import tempfile
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .models import Question, QuestionBankVersion
+
+
+BANK_DB = 'bank'
+
+
+def enabled():
+    return settings.QUESTION_BANK_SEPARATE and BANK_DB in settings.DATABASES
+
+
+def is_available():
+    """Whether question reads can go to the copy: it is enabled and has been published."""
+    return enabled() and os.path.exists(settings.QUESTION_BANK_DATABASE)
+
+
+def published_version():
+    """The bank version the copy was published at; it may lag the default database briefly."""
+    return QuestionBankVersion.objects.using(BANK_DB).filter(id=1).values_list('version', flat=True).first() or 0
+
+
+def reconnect():
+    # An open connection keeps reading the file it opened, even after a swap.
+    connections[BANK_DB].close()
+
+
+def publish(using=DEFAULT_DB_ALIAS):
+    """Copy the committed question bank from ``using`` and swap it in atomically."""
+    target = Path(settings.QUESTION_BANK_DATABASE)
+    fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=f'.{target.name}.', suffix='.tmp')
+    os.close(fd)
+    try:
+        with closing(sqlite3.connect(tmp_path, isolation_level=None)) as bank:
+            bank.execute('ATTACH DATABASE ? AS source', (str(connections[using].settings_dict['NAME']),))
+            tables = [Question._meta.db_table, QuestionBankVersion._meta.db_table]
+            schema = bank.execute(
+                f"SELECT sql FROM source.sqlite_master WHERE tbl_name IN ({', '.join('?' * len(tables))}) "
+                "AND sql IS NOT NULL ORDER BY type = 'index'",
+                tables,
+            ).fetchall()
+            for (statement,) in schema:
+                bank.execute(statement)
+            # One transaction, so the questions and version come from the same commit.
+            bank.execute('BEGIN')
+            for table in tables:
+                bank.execute(f'INSERT INTO main."{table}" SELECT * FROM source."{table}"')
+            bank.execute('COMMIT')
+            bank.execute('DETACH DATABASE source')
+        # mkstemp creates the file private to this user; web workers may run as another.
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
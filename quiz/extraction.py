@@ -0,0 +1,79 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from .pdf_cache import PageTextCache
+import PyPDF2
+
+
+def count_pages(pdf_path):
+    with open(pdf_path, 'rb') as file:
+        return len(PyPDF2.PdfReader(file).pages)
+
+
+def extract_page_range(pdf_path, start, end):
+    # Each worker opens its own reader; PdfReader objects can't be pickled.
+    with open(pdf_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [pdf_reader.pages[i].extract_text() for i in range(start, end)]
+
+
+def page_ranges(total_pages, jobs, first=0, span=None):
+    # A few chunks per worker keeps the pool busy when some pages are
+    # much heavier than others. ``span`` sizes the chunks for callers that
+    # only expect to read that many pages from ``first``.
+    span = total_pages - first if span is None else min(span, total_pages - first)
+    chunk_size = max(1, -(-span // (jobs * 4)))
+    return [(start, min(start + chunk_size, total_pages))
+            for start in range(first, total_pages, chunk_size)]
+
+
+def iter_pages(pdf_path, jobs=1, cache=True, first_page=1, last_page=None):
+    """
+    Yield ``(page_number, text)`` for every page of ``pdf_path`` from
+    ``first_page`` on, in page order, starting at 1. Pages are produced as
+    soon as they are extracted, so callers can start parsing before the
+    whole document has been read. ``last_page`` is only a hint for callers
+    that stop reading shortly after it.
+
+    With ``cache`` the text is served from, or saved to, the on-disk
+    ``PageTextCache`` keyed by the PDF's digest. Only reads of the whole
+    document are saved.
+    """
+    if not cache:
+        return extract_pages(pdf_path, jobs, first_page, last_page)
+
+    text_cache = PageTextCache()
+    key = text_cache.key(pdf_path)
+    pages = text_cache.read(key, first_page)
+    if pages is None:
+        pages = extract_pages(pdf_path, jobs, first_page, last_page)
+        if first_page == 1:
+            pages = text_cache.store(key, pages)
+    return pages
+
+
+def extract_pages(pdf_path, jobs=1, first_page=1, last_page=None):
+    if jobs <= 1:
+        with open(pdf_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            for index in range(first_page - 1, len(pdf_reader.pages)):
+                yield index + 1, pdf_reader.pages[index].extract_text()
+        return
+
+    span = None if last_page is None else last_page - first_page + 1
+    ranges = deque(page_ranges(count_pages(pdf_path), jobs, first_page - 1, span))
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        try:
+            # Only keep a bounded window of chunks in flight so a slow consumer
+            # doesn't let extracted text pile up in memory.
+            while ranges or pending:
+                while ranges and len(pending) < jobs * 2:
+                    start, end = ranges.popleft()
+                    pending.append((start, pool.submit(extract_page_range, str(pdf_path), start, end)))
+                start, future = pending.popleft()
+                for offset, text in enumerate(future.result()):
+                    yield start + offset + 1, text
+        finally:
+            # A consumer that stops early shouldn't wait for chunks it won't read.
+            for _, future in pending:
+                future.cancel()
@@ -0,0 +1,287 @@
+"""
+Streaming question-bank ingestion.
+
+Each stage is a generator consuming the previous one, so a PDF is processed
+page by page: pages (``quiz.extraction``) -> parsed questions
+(``quiz.parsing``) -> database writes. Only the question currently being
+assembled is held in memory.
+
+Replacing or syncing the bank needs every question before it can decide
+what to delete, so parsed questions are first spooled to a temporary file
+(``QuestionSpool``). The write transaction opens only once extraction and
+parsing have finished, and holds the database's write lock just for the
+delete and upsert, not for the whole import.
+
+Parsed questions are written either by replacing the whole bank or by
+syncing against it, where each question's content hash decides whether
+its row needs to change. Very large banks can instead be imported a page
+range at a time, with an ``ImportCheckpoint`` committed after every batch
+of pages so an interrupted import picks up where it stopped.
+"""
+import hashlib
+import pickle
+import tempfile
+import time
+
+from django.db import transaction
+from django.db.models import Count, F
+
+from .bank import bank_changed
+from .models import Answer, ImportCheckpoint, Question, QuizSession
+
+
+DEFAULT_BATCH_SIZE = 500
+
+CONTENT_FIELDS = (
+    'question_text', 'option_a', 'option_b', 'option_c', 'option_d',
+    'correct_option', 'explanation',
+)
+
+
+def question_hash(q_data):
+    content = '\x1f'.join(q_data[field] for field in CONTENT_FIELDS)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class QuestionWriter:
+    """
+    Buffers parsed questions and writes them with multi-row
+    ``INSERT ... ON CONFLICT (source, question_number) DO UPDATE``
+    statements, so a re-import of an existing question updates that row in
+    place and keeps its id. Callers are expected to wrap a writer in a transaction.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.pending = []
+        self.written = 0
+        self.seconds = 0.0
+
+    def add(self, q_data, content_hash):
+        self.pending.append(Question(content_hash=content_hash, **q_data))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        started = time.perf_counter()
+        Question.objects.bulk_create(
+            self.pending,
+            batch_size=self.batch_size,
+            update_conflicts=True,
+            unique_fields=['source', 'question_number'],
+            update_fields=list(CONTENT_FIELDS) + ['content_hash'],
+        )
+        self.seconds += time.perf_counter() - started
+        self.written += len(self.pending)
+        self.pending = []
+
+    def rows_per_second(self):
+        return self.written / self.seconds if self.seconds else 0.0
+
+
+def new_summary():
+    return {
+        'parsed': 0, 'created': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0, 'duplicates': 0,
+        'rows_per_second': 0.0,
+    }
+
+
+class QuestionSpool:
+    """
+    Runs ``questions`` to the end, pickling each one with its content hash
+    to a temporary file, and then iterates them back from it. The first
+    question parsed for each (source, question_number) is kept; later ones
+    are counted as duplicates in ``summary``.
+    """
+
+    def __init__(self, questions, summary):
+        self.file = tempfile.TemporaryFile()
+        self.keys = set()
+        try:
+            for q_data in questions:
+                summary['parsed'] += 1
+                key = (q_data['source'], q_data['question_number'])
+                if key in self.keys:
+                    summary['duplicates'] += 1
+                    continue
+                self.keys.add(key)
+                pickle.dump((q_data, question_hash(q_data)), self.file, pickle.HIGHEST_PROTOCOL)
+        except BaseException:
+            self.file.close()
+            raise
+
+    def __iter__(self):
+        self.file.seek(0)
+        while True:
+            try:
+                yield pickle.load(self.file)
+            except EOFError:
+                return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.file.close()
+
+
+def delete_questions(questions):
+    """
+    Delete the ``questions`` queryset and return how many were deleted.
+    Their answers go with them, so open sessions' scores first lose the
+    correct ones; submitted sessions keep theirs, as their results are final.
+    Call it inside a transaction.
+    """
+    lost = (
+        Answer.objects.filter(question__in=questions, is_correct=True, session__is_completed=False)
+        .values('session_id').annotate(correct=Count('id'))
+    )
+    for row in lost:
+        QuizSession.objects.filter(id=row['session_id']).update(score=F('score') - row['correct'])
+    _, deleted = questions.delete()
+    return deleted.get(Question._meta.label, 0)
+
+
+def replace_questions(questions, sources=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Replace the question bank, or just the banks named in ``sources``, with
+    ``questions``. Nothing is changed if no questions are parsed; repeated
+    question numbers keep the first.
+    """
+    summary = new_summary()
+    writer = QuestionWriter(batch_size)
+    with QuestionSpool(questions, summary) as spool:
+        if not summary['parsed']:
+            return summary
+
+        with transaction.atomic():
+            existing = Question.objects.all()
+            if sources is not None:
+                existing = existing.filter(source__in=sources)
+            summary['deleted'] = delete_questions(existing)
+
+            for q_data, content_hash in spool:
+                writer.add(q_data, content_hash)
+                summary['created'] += 1
+
+            writer.flush()
+            bank_changed()
+    summary['rows_per_second'] = writer.rows_per_second()
+    return summary
+
+
+def sync_questions(questions, sources=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Bring the question bank in line with ``questions``, keyed by source
+    and ``question_number``: only new, changed and vanished questions are
+    written, so existing rows keep their ids and an unchanged import
+    touches no rows at all. With ``sources``, questions from other banks
+    are left alone.
+    """
+    summary = new_summary()
+    writer = QuestionWriter(batch_size)
+    # The first question parsed for a number wins, as in a full import.
+    with QuestionSpool(questions, summary) as spool, transaction.atomic():
+        existing = Question.objects.all()
+        if sources is not None:
+            existing = existing.filter(source__in=sources)
+        stored = {
+            (source, number): (pk, content_hash)
+            for pk, source, number, content_hash
+            in existing.values_list('id', 'source', 'question_number', 'content_hash')
+        }
+
+        for q_data, content_hash in spool:
+            key = (q_data['source'], q_data['question_number'])
+            if key not in stored:
+                writer.add(q_data, content_hash)
+                summary['created'] += 1
+            elif stored[key][1] != content_hash:
+                writer.add(q_data, content_hash)
+                summary['updated'] += 1
+            else:
+                summary['unchanged'] += 1
+
+        writer.flush()
+        # An empty parse almost certainly means a broken PDF, not an empty bank.
+        stale = [pk for key, (pk, _) in stored.items() if key not in spool.keys]
+        if spool.keys and stale:
+            summary['deleted'] = delete_questions(Question.objects.filter(id__in=stale))
+        if summary['created'] or summary['updated'] or summary['deleted']:
+            bank_changed()
+    summary['rows_per_second'] = writer.rows_per_second()
+    return summary
+
+
+def open_checkpoint(source, digest, first_page, last_page, resume=False):
+    """
+    Return the checkpoint for importing pages ``first_page`` to
+    ``last_page`` of the PDF with ``digest``. Unless resuming, earlier
+    progress on that range is discarded.
+    """
+    checkpoint, created = ImportCheckpoint.objects.get_or_create(
+        pdf_digest=digest, first_page=first_page, last_page=last_page,
+        defaults={'source': source, 'next_page': first_page},
+    )
+    if not created and not resume:
+        checkpoint.source = source
+        checkpoint.next_page = first_page
+        checkpoint.questions_written = 0
+        checkpoint.is_completed = False
+        checkpoint.save()
+    return checkpoint
+
+
+def write_batches(batches, checkpoint, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Write the ``(questions, next_page)`` batches from
+    ``parsing.parse_page_batches``, each in its own transaction together
+    with the advanced ``checkpoint``. Questions are only created or
+    updated: a page range can't tell which questions have vanished, so
+    nothing is deleted.
+    """
+    summary = new_summary()
+    writer = QuestionWriter(batch_size)
+    seen = set()
+
+    for questions, next_page in batches:
+        with transaction.atomic():
+            stored = dict(
+                Question.objects
+                .filter(source=checkpoint.source, question_number__in={q['question_number'] for q in questions})
+                .values_list('question_number', 'content_hash')
+            )
+            written = 0
+            rows_before = writer.written
+
+            for q_data in questions:
+                number = q_data['question_number']
+                summary['parsed'] += 1
+                if number in seen:
+                    summary['duplicates'] += 1
+                    continue
+                seen.add(number)
+                content_hash = question_hash(q_data)
+                written += 1
+
+                if number not in stored:
+                    writer.add(q_data, content_hash)
+                    summary['created'] += 1
+                elif stored[number] != content_hash:
+                    writer.add(q_data, content_hash)
+                    summary['updated'] += 1
+                else:
+                    summary['unchanged'] += 1
+
+            writer.flush()
+            if writer.written > rows_before:
+                bank_changed()
+            checkpoint.next_page = checkpoint.last_page + 1 if next_page is None else next_page
+            checkpoint.questions_written += written
+            checkpoint.is_completed = next_page is None
+            checkpoint.save()
+
+    summary['rows_per_second'] = writer.rows_per_second()
+    return summary
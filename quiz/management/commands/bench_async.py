@@ -0,0 +1,148 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, override_settings
+from django.urls import include, path
+from quiz import async_views, views
+from quiz.models import QuizSession
+from quiz.urls import quiz_urlpatterns
+from datetime import datetime, timezone
+from pathlib import Path
+from types import ModuleType
+from .bench_ingest import git_commit
+import asyncio
+import json
+import re
+import statistics
+import time
+
+
+class Command(BaseCommand):
+    help = 'Compare the sync and async quiz views with many candidates taking an exam at once'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--candidates',
+            type=int,
+            default=300,
+            help='Number of simultaneous candidates',
+        )
+        parser.add_argument(
+            '--questions',
+            type=int,
+            default=10,
+            help='Questions each candidate visits and answers before submitting',
+        )
+        parser.add_argument(
+            '--views',
+            choices=('sync', 'async', 'both'),
+            default='both',
+            help='Which views to benchmark',
+        )
+        parser.add_argument(
+            '--output',
+            help='Where to save the JSON results (default: bench_results/async-<commit>.json)',
+        )
+
+    def handle(self, *args, **kwargs):
+        modes = ('sync', 'async') if kwargs['views'] == 'both' else (kwargs['views'],)
+        commit = git_commit()
+
+        report = {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': commit,
+            'candidates': kwargs['candidates'],
+            'questions': kwargs['questions'],
+            'session_engine': settings.SESSION_ENGINE,
+            'state_in_session': settings.QUIZ_STATE_IN_SESSION,
+            'runs': {},
+        }
+
+        for mode in modes:
+            try:
+                run = self.run_mode(mode, kwargs['candidates'], kwargs['questions'])
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'{mode} views failed: {e}'))
+                return
+            report['runs'][mode] = run
+
+            self.stdout.write(self.style.SUCCESS(
+                f"{mode}: {run['requests']} requests in {run['wall_seconds']:.2f}s "
+                f"({run['requests_per_second']:.1f} requests/s, {run['errors']} errors)"
+            ))
+            for page, latency in run['latency_ms'].items():
+                self.stdout.write(f"  {page:<9} p50 {latency['p50']:8.1f}ms  p95 {latency['p95']:8.1f}ms  max {latency['max']:8.1f}ms")
+
+        output = Path(kwargs['output'] or settings.BASE_DIR / 'bench_results' / f'async-{commit or "unknown"}.json')
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2))
+        self.stdout.write(f'Results saved to {output}')
+
+    def run_mode(self, mode, candidates, questions):
+        # Only the quiz URLs are needed, wired to the views being measured.
+        urlconf = ModuleType(f'bench_async_{mode}_urls')
+        urlconf.urlpatterns = [path('', include(quiz_urlpatterns(async_views if mode == 'async' else views)))]
+        last_id = QuizSession.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        try:
+            with override_settings(ROOT_URLCONF=urlconf):
+                started = time.perf_counter()
+                results = asyncio.run(run_candidates(candidates, questions))
+                wall_seconds = time.perf_counter() - started
+        finally:
+            # Leave only real candidates' sessions behind.
+            QuizSession.objects.filter(id__gt=last_id).delete()
+
+        latencies = {}
+        errors = 0
+        for candidate in results:
+            for page, seconds, ok in candidate:
+                latencies.setdefault(page, []).append(seconds * 1000)
+                errors += not ok
+        requests = sum(len(candidate) for candidate in results)
+        return {
+            'requests': requests,
+            'errors': errors,
+            'wall_seconds': wall_seconds,
+            'requests_per_second': requests / wall_seconds,
+            'latency_ms': {page: summarize(values) for page, values in latencies.items()},
+        }
+
+
+QUESTION_ID = re.compile(r'const questionId = (\d+);')
+
+
+async def run_candidates(candidates, questions):
+    return await asyncio.gather(*(take_exam(questions) for _ in range(candidates)))
+
+
+async def take_exam(questions):
+    """One candidate's exam; returns ``(page, seconds, ok)`` per request."""
+    client = AsyncClient()
+    timings = []
+
+    async def request(page, method, url, expected, **kwargs):
+        started = time.perf_counter()
+        response = await getattr(client, method)(url, **kwargs)
+        timings.append((page, time.perf_counter() - started, response.status_code == expected))
+        return response
+
+    await request('begin', 'get', '/begin/', 302)
+    for index in range(questions):
+        response = await request('question', 'get', f'/question/{index}/', 200)
+        match = QUESTION_ID.search(response.content.decode())
+        question_id = int(match.group(1)) if match else 0
+        await request('save', 'post', '/save-answers/', 200, content_type='application/json', data=json.dumps({
+            'changes': [{'question_id': question_id, 'answer': 'ABCD'[index % 4], 'seq': index + 1}],
+        }))
+    await request('submit', 'post', '/submit/', 302)
+    await request('results', 'get', '/results/', 200)
+    await request('explanation', 'get', '/explanation/', 200)
+    return timings
+
+
+def summarize(values):
+    values = sorted(values)
+    return {
+        'p50': statistics.median(values),
+        'p95': values[min(len(values) - 1, int(len(values) * 0.95))],
+        'max': values[-1],
+    }
@@ -0,0 +1,213 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from quiz.extraction import iter_pages
+from quiz.ingest import DEFAULT_BATCH_SIZE, replace_questions
+from quiz.parsing import QuestionParser, parse_pages
+from quiz.synthetic_pdf import LAYOUTS, write_question_bank
+from datetime import datetime, timezone
+from pathlib import Path
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import PyPDF2
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the import pipeline against generated question-bank PDFs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--questions',
+            type=int,
+            default=2000,
+            help='Number of questions in each generated PDF',
+        )
+        parser.add_argument(
+            '--layout',
+            choices=LAYOUTS + ('both',),
+            default='both',
+            help='PDF layout to generate',
+        )
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=1,
+            help='Worker processes for page extraction',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Number of questions written per INSERT statement',
+        )
+        parser.add_argument(
+            '--output',
+            help='Where to save the JSON results (default: bench_results/ingest-<commit>.json)',
+        )
+        parser.add_argument(
+            '--compare',
+            help='Earlier results file to compare against',
+        )
+        # Internal: run the streamed import of one PDF and print its figures
+        # as JSON, so each layout is measured in a fresh process.
+        parser.add_argument('--streamed-run', help=argparse.SUPPRESS)
+
+    def handle(self, *args, **kwargs):
+        if kwargs['streamed_run']:
+            run = run_streamed(Path(kwargs['streamed_run']), kwargs['jobs'], kwargs['batch_size'])
+            self.stdout.write(json.dumps(run))
+            return
+
+        layouts = LAYOUTS if kwargs['layout'] == 'both' else (kwargs['layout'],)
+        commit = git_commit()
+
+        report = {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': commit,
+            'python': platform.python_version(),
+            'pypdf2': PyPDF2.__version__,
+            'questions': kwargs['questions'],
+            'jobs': kwargs['jobs'],
+            'batch_size': kwargs['batch_size'],
+            'runs': {},
+        }
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for layout in layouts:
+                pdf_path = Path(tmp_dir) / f'bench-{layout}.pdf'
+                write_question_bank(pdf_path, kwargs['questions'], layout=layout)
+                run = self.run_layout(pdf_path, kwargs['jobs'], kwargs['batch_size'])
+                report['runs'][layout] = run
+
+                self.stdout.write(self.style.SUCCESS(
+                    f"{layout}: {run['pages']} pages, {run['questions']} questions in {run['wall_seconds']:.2f}s "
+                    f"({run['pages_per_second']:.1f} pages/s, {run['questions_per_second']:.1f} questions/s, "
+                    f"peak RSS {run['peak_rss_kb'] / 1024:.1f} MB from {run['startup_rss_kb'] / 1024:.1f} MB at start)"
+                ))
+                self.stdout.write(f"  stages, one after the other ({run['staged_seconds']:.2f}s):")
+                for stage, seconds in run['stages'].items():
+                    self.stdout.write(f'  {stage:<8} {seconds:8.3f}s')
+
+        output = Path(kwargs['output'] or settings.BASE_DIR / 'bench_results' / f'ingest-{commit or "unknown"}.json')
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2))
+        self.stdout.write(f'Results saved to {output}')
+
+        if kwargs['compare']:
+            self.compare(json.loads(Path(kwargs['compare']).read_text()), report)
+
+    def run_layout(self, pdf_path, jobs, batch_size):
+        stages = {}
+
+        # Stages are run one after the other on materialized input so each
+        # is timed on its own; the importers interleave them.
+        started = time.perf_counter()
+        pages = list(iter_pages(pdf_path, jobs=jobs, cache=False))
+        stages['extract'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        parser = QuestionParser(source=pdf_path.stem)
+        questions = list(parse_pages(pages, parser))
+        stages['parse'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            replace_questions(questions, sources=[pdf_path.stem], batch_size=batch_size)
+            # Leave the real question bank untouched.
+            transaction.set_rollback(True)
+        stages['write'] = time.perf_counter() - started
+
+        # Throughput and memory come from a streamed import, as
+        # load_questions runs it, in a process of its own: ru_maxrss is the
+        # peak over a process's whole life, and the lists above would
+        # dominate it.
+        result = subprocess.run(
+            [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'bench_ingest', '--streamed-run', str(pdf_path),
+             '--jobs', str(jobs), '--batch-size', str(batch_size)],
+            capture_output=True, text=True, check=True,
+        )
+        streamed = json.loads(result.stdout.strip().splitlines()[-1])
+
+        return {
+            'pages': len(pages),
+            'lines': parser.lines,
+            'questions': streamed['questions'],
+            'rejected': parser.rejected,
+            'wall_seconds': streamed['wall_seconds'],
+            'pages_per_second': len(pages) / streamed['wall_seconds'],
+            'questions_per_second': streamed['questions'] / streamed['wall_seconds'],
+            'startup_rss_kb': streamed['startup_rss_kb'],
+            'peak_rss_kb': streamed['peak_rss_kb'],
+            'peak_worker_rss_kb': streamed['peak_worker_rss_kb'],
+            'stages': stages,
+            'staged_seconds': sum(stages.values()),
+        }
+
+    def compare(self, baseline, report):
+        self.stdout.write(f"Compared with {baseline.get('commit') or 'baseline'}:")
+        for layout, run in report['runs'].items():
+            before = baseline.get('runs', {}).get(layout)
+            if not before:
+                continue
+            for metric in ('pages_per_second', 'questions_per_second', 'peak_rss_kb'):
+                change = (run[metric] - before[metric]) / before[metric] * 100 if before[metric] else 0.0
+                self.stdout.write(f'  {layout} {metric}: {before[metric]:.1f} -> {run[metric]:.1f} ({change:+.1f}%)')
+            for stage, seconds in run['stages'].items():
+                previous = before['stages'].get(stage)
+                if previous:
+                    self.stdout.write(f'  {layout} {stage}: {previous:.3f}s -> {seconds:.3f}s '
+                                      f'({(seconds - previous) / previous * 100:+.1f}%)')
+
+
+def run_streamed(pdf_path, jobs, batch_size):
+    """Import ``pdf_path`` the way ``load_questions`` does, rolled back, and report time and peak memory."""
+    startup_rss_kb = peak_rss_kb()
+    started = time.perf_counter()
+    with transaction.atomic():
+        pages = iter_pages(pdf_path, jobs=jobs, cache=False)
+        summary = replace_questions(
+            parse_pages(pages, QuestionParser(source=pdf_path.stem)),
+            sources=[pdf_path.stem], batch_size=batch_size,
+        )
+        transaction.set_rollback(True)
+    wall_seconds = time.perf_counter() - started
+    return {
+        'questions': summary['parsed'],
+        'wall_seconds': wall_seconds,
+        'startup_rss_kb': startup_rss_kb,
+        'peak_rss_kb': peak_rss_kb(),
+        'peak_worker_rss_kb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    }
+
+
+def peak_rss_kb():
+    """
+    This process's peak resident memory. On Linux ``ru_maxrss`` starts
+    from the parent's peak, even across exec, so VmHWM is read instead.
+    """
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def git_commit():
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
@@ -0,0 +1,134 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from quiz.extraction import iter_pages
+from quiz.parsing import QuestionParser, parse_pages
+import re
+import time
+
+
+class Command(BaseCommand):
+    help = 'Measure question parser throughput in lines/second'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pdf',
+            default=str(settings.BASE_DIR / 'simulator' / 'questions.pdf'),
+            help='PDF whose extracted text is parsed',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Number of passes over the extracted text',
+        )
+        parser.add_argument(
+            '--baseline',
+            action='store_true',
+            help='Also time the original per-line re.match parser for comparison',
+        )
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write(f"Extracting text from {kwargs['pdf']}...")
+        pages = list(iter_pages(kwargs['pdf']))
+        line_count = sum(text.count('\n') + 1 for _, text in pages)
+        repeat = kwargs['repeat']
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            parser = QuestionParser()
+            for _ in parse_pages(pages, parser):
+                pass
+        engine_seconds = time.perf_counter() - started
+        engine_rate = line_count * repeat / engine_seconds
+
+        self.stdout.write(
+            f'quiz.parsing: {engine_rate:,.0f} lines/second '
+            f'({parser.parsed} questions, {parser.rejected} rejected blocks)'
+        )
+
+        if kwargs['baseline']:
+            started = time.perf_counter()
+            for _ in range(repeat):
+                baseline_count = len(baseline_parse(pages))
+            baseline_seconds = time.perf_counter() - started
+            baseline_rate = line_count * repeat / baseline_seconds
+
+            self.stdout.write(f'baseline:     {baseline_rate:,.0f} lines/second ({baseline_count} questions)')
+            self.stdout.write(self.style.SUCCESS(f'Speed-up: {engine_rate / baseline_rate:.1f}x'))
+
+
+# The parser load_questions used before quiz.parsing, kept only as a
+# benchmark reference: every pattern is looked up and matched per line.
+
+def baseline_parse(pages):
+    full_text = ''
+    for _, text in pages:
+        full_text += text
+
+    clean_lines = []
+    for line in full_text.split('\n'):
+        line = line.strip()
+        if line and not baseline_is_header_footer(line):
+            clean_lines.append(line)
+    text = '\n'.join(clean_lines)
+
+    questions = []
+    question_pattern = r'Question\s*(\d+)[:\s]*(.+?)(?=Question\s*\d+|$)'
+    for match in re.finditer(question_pattern, text, re.DOTALL | re.IGNORECASE):
+        parsed = baseline_parse_single_question(int(match.group(1)), match.group(2).strip())
+        if parsed:
+            questions.append(parsed)
+    return questions
+
+
+def baseline_parse_single_question(q_num, content):
+    lines = [line.strip() for line in content.split('\n') if line.strip()]
+    if len(lines) < 7:
+        return None
+
+    options = {}
+    correct_option = ''
+    explanation = ''
+    i = 1
+    while i < len(lines):
+        line = lines[i]
+        for letter in 'ABCD':
+            pattern = rf'^[{letter}{letter.lower()}][\.:\)]\s*'
+            if re.match(pattern, line):
+                options[letter] = re.sub(pattern, '', line).strip()
+                break
+        else:
+            if re.match(r'^(Correct\s*Answer|Answer)[:\s]*([A-Da-d])', line, re.IGNORECASE):
+                match = re.search(r'([A-Da-d])', line)
+                if match:
+                    correct_option = match.group(1).upper()
+            elif re.match(r'^(Explanation|Exp)[:\s]*', line, re.IGNORECASE):
+                explanation = re.sub(r'^(Explanation|Exp)[:\s]*', '', line, flags=re.IGNORECASE).strip()
+                j = i + 1
+                while j < len(lines) and not re.match(r'^Question\s*\d+', lines[j], re.IGNORECASE):
+                    if not re.match(r'^[A-Da-d][\.:\)]\s*', lines[j]) and not re.match(r'^(Correct\s*Answer|Answer)', lines[j], re.IGNORECASE):
+                        explanation += ' ' + lines[j]
+                    j += 1
+                break
+        i += 1
+
+    if len(options) < 4 or not correct_option:
+        return None
+    return {'question_number': q_num, 'question_text': lines[0], 'explanation': explanation.strip(), **options}
+
+
+def baseline_is_header_footer(line):
+    header_footer_patterns = [
+        r'^\d+$',
+        r'^Page\s*\d+',
+        r'^\s*$',
+        r'^www\.',
+        r'\.com\s*$',
+        r'^Logo',
+        r'^Header',
+        r'^Footer',
+    ]
+    for pattern in header_footer_patterns:
+        if re.match(pattern, line, re.IGNORECASE):
+            return True
+    return False
@@ -0,0 +1,264 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections
+from django.utils import timezone
+from quiz.bank import assemble_exam
+from quiz.extraction import iter_pages
+from quiz.ingest import replace_questions, sync_questions
+from quiz.models import Answer, QuizSession
+from quiz.parsing import QuestionParser, parse_pages, source_name
+from quiz.synthetic_pdf import write_question_bank
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from pathlib import Path
+from .bench_ingest import git_commit
+import json
+import multiprocessing
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+
+# How long a process waits for the others to finish setting up.
+SETUP_TIMEOUT = 120
+
+
+class Command(BaseCommand):
+    help = 'Measure answer-save throughput and lock errors with many processes writing to SQLite at once'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Processes saving answers at the same time, like server workers',
+        )
+        parser.add_argument(
+            '--candidates',
+            type=int,
+            default=25,
+            help='Open quiz sessions per worker',
+        )
+        parser.add_argument(
+            '--seconds',
+            type=float,
+            default=5.0,
+            help='How long each run saves answers for',
+        )
+        parser.add_argument(
+            '--batch',
+            type=int,
+            default=5,
+            help='Answer changes per save, like one quiz.js flush',
+        )
+        parser.add_argument(
+            '--tuning',
+            choices=('on', 'off', 'both'),
+            default='both',
+            help='Run with the SQLITE_PRAGMAS and transaction mode from settings, without them, or both',
+        )
+        parser.add_argument(
+            '--import-questions',
+            type=int,
+            default=0,
+            help='Also re-import a synthetic bank of this many questions over and over while answers are saved, '
+                 'alternating full and --incremental imports (default: no import)',
+        )
+        parser.add_argument(
+            '--output',
+            help='Where to save the JSON results (default: bench_results/writes-<commit>.json)',
+        )
+
+    def handle(self, *args, **kwargs):
+        if connection.vendor != 'sqlite':
+            self.stdout.write(self.style.ERROR('bench_writes only runs against SQLite'))
+            return
+        runs = ('off', 'on') if kwargs['tuning'] == 'both' else (kwargs['tuning'],)
+        commit = git_commit()
+
+        report = {
+            'timestamp': datetime.now(dt_timezone.utc).isoformat(timespec='seconds'),
+            'commit': commit,
+            'sqlite': sqlite3.sqlite_version,
+            'workers': kwargs['workers'],
+            'candidates': kwargs['candidates'],
+            'seconds': kwargs['seconds'],
+            'batch': kwargs['batch'],
+            'import_questions': kwargs['import_questions'],
+            'pragmas': settings.SQLITE_PRAGMAS,
+            'runs': {},
+        }
+
+        for tuning in runs:
+            try:
+                run = self.run_tuning(tuning == 'on', kwargs)
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'Run with tuning {tuning} failed: {e}'))
+                return
+            report['runs'][tuning] = run
+
+            self.stdout.write(self.style.SUCCESS(
+                f"tuning {tuning}: {run['saves']} saves in {run['wall_seconds']:.2f}s "
+                f"({run['saves_per_second']:.1f} saves/s, {run['lock_errors']} lock errors)"
+            ))
+            self.stdout.write(f"  latency p50 {run['latency_ms']['p50']:.1f}ms  p95 {run['latency_ms']['p95']:.1f}ms  "
+                              f"max {run['latency_ms']['max']:.1f}ms")
+            if 'imports' in run:
+                self.stdout.write(f"  {run['imports']} imports alongside, {run['import_seconds']:.2f}s each, "
+                                  f"{run['import_lock_errors']} import lock errors")
+
+        output = Path(kwargs['output'] or settings.BASE_DIR / 'bench_results' / f'writes-{commit or "unknown"}.json')
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2))
+        self.stdout.write(f'Results saved to {output}')
+
+    def run_tuning(self, tuned, kwargs):
+        context = multiprocessing.get_context('fork')
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # Each run writes to its own copy, so the real database is left
+            # alone and both runs start from the same data.
+            db_path = Path(tmp_dir) / 'bench.sqlite3'
+            source = sqlite3.connect(connection.settings_dict['NAME'])
+            target = sqlite3.connect(db_path)
+            source.backup(target)
+            source.close()
+            target.close()
+            connections.close_all()
+
+            importing = kwargs['import_questions'] > 0
+            barrier = context.Barrier(kwargs['workers'] + importing)
+            results = context.Queue()
+            workers = [
+                context.Process(target=save_answers, args=(
+                    str(db_path), tuned, kwargs['candidates'], kwargs['seconds'], kwargs['batch'], barrier, results,
+                ))
+                for _ in range(kwargs['workers'])
+            ]
+            if importing:
+                pdf_path = Path(tmp_dir) / 'bench_import.pdf'
+                write_question_bank(pdf_path, kwargs['import_questions'])
+                workers.append(context.Process(target=import_questions, args=(
+                    str(db_path), tuned, str(pdf_path), kwargs['seconds'], barrier, results,
+                )))
+            for worker in workers:
+                worker.start()
+            reports = [results.get() for _ in workers]
+            for worker in workers:
+                worker.join()
+
+        # A process that fails breaks the barrier for the others; report its error.
+        errors = sorted(
+            (report['error'] for report in reports if report.get('error')),
+            key=lambda error: error.startswith(threading.BrokenBarrierError.__name__),
+        )
+        if errors:
+            raise RuntimeError(errors[0])
+        imports = [report for report in reports if 'imports' in report]
+        reports = [report for report in reports if 'imports' not in report]
+        latencies = sorted(seconds * 1000 for report in reports for seconds in report['latencies'])
+        saves = len(latencies)
+        wall_seconds = max(report['wall_seconds'] for report in reports)
+        run = {
+            'saves': saves,
+            'answers': sum(report['answers'] for report in reports),
+            'lock_errors': sum(report['lock_errors'] for report in reports),
+            'wall_seconds': wall_seconds,
+            'saves_per_second': saves / wall_seconds,
+            'latency_ms': {
+                'p50': statistics.median(latencies) if latencies else 0.0,
+                'p95': latencies[min(saves - 1, int(saves * 0.95))] if latencies else 0.0,
+                'max': latencies[-1] if latencies else 0.0,
+            },
+        }
+        for report in imports:
+            run['imports'] = report['imports']
+            run['import_seconds'] = statistics.mean(report['import_seconds']) if report['import_seconds'] else 0.0
+            run['import_lock_errors'] = report['lock_errors']
+        return run
+
+
+def use_copy(db_path, tuned):
+    """Point this process's connection at the copy, without the tuning unless ``tuned``."""
+    connection.settings_dict['NAME'] = db_path
+    if not tuned:
+        settings.SQLITE_PRAGMAS = {}
+        connection.settings_dict['OPTIONS'] = {
+            key: value for key, value in connection.settings_dict['OPTIONS'].items() if key != 'transaction_mode'
+        }
+
+
+def save_answers(db_path, tuned, candidates, seconds, batch, barrier, results):
+    """Worker process: open ``candidates`` sessions, then save answers to them for ``seconds``."""
+    report = {'latencies': [], 'answers': 0, 'lock_errors': 0, 'wall_seconds': 0.0}
+    try:
+        # Everything below runs on this process's own connection to the copy.
+        use_copy(db_path, tuned)
+
+        sessions = []
+        for _ in range(candidates):
+            question_ids, seed = assemble_exam()
+            quiz_session = QuizSession(seed=seed, deadline=timezone.now() + timedelta(hours=1))
+            quiz_session.set_selected_questions(question_ids)
+            quiz_session.save()
+            sessions.append((quiz_session.id, question_ids))
+        rng = random.Random()
+        seq = 0
+
+        barrier.wait(SETUP_TIMEOUT)
+        started = time.perf_counter()
+        while time.perf_counter() - started < seconds:
+            session_id, question_ids = rng.choice(sessions)
+            changes = []
+            for question_id in rng.sample(question_ids, min(batch, len(question_ids))):
+                seq += 1
+                changes.append({'question_id': question_id, 'answer': rng.choice('ABCD'), 'seq': seq})
+            save_started = time.perf_counter()
+            try:
+                report['answers'] += Answer.record_changes(session_id, changes)
+            except OperationalError as e:
+                if 'locked' not in str(e):
+                    raise
+                report['lock_errors'] += 1
+                continue
+            report['latencies'].append(time.perf_counter() - save_started)
+        report['wall_seconds'] = time.perf_counter() - started
+    except Exception as e:
+        report['error'] = f'{type(e).__name__}: {e}'
+        barrier.abort()
+    finally:
+        connection.close()
+        results.put(report)
+
+
+def import_questions(db_path, tuned, pdf_path, seconds, barrier, results):
+    """Importer process: re-import ``pdf_path`` for ``seconds``, like ``load_questions`` run during an exam."""
+    report = {'imports': 0, 'import_seconds': [], 'lock_errors': 0}
+    try:
+        use_copy(db_path, tuned)
+        # Never publish the benchmark's bank over the real read-only copy.
+        settings.QUESTION_BANK_SEPARATE = False
+        source = source_name(pdf_path)
+
+        barrier.wait(SETUP_TIMEOUT)
+        started = time.perf_counter()
+        while time.perf_counter() - started < seconds:
+            # After the first full import, the incremental ones change nothing.
+            write = sync_questions if report['imports'] % 2 else replace_questions
+            import_started = time.perf_counter()
+            try:
+                write(parse_pages(iter_pages(pdf_path, cache=False), QuestionParser(source=source)), sources=[source])
+            except OperationalError as e:
+                if 'locked' not in str(e):
+                    raise
+                report['lock_errors'] += 1
+            report['imports'] += 1
+            report['import_seconds'].append(time.perf_counter() - import_started)
+    except Exception as e:
+        report['error'] = f'{type(e).__name__}: {e}'
+        barrier.abort()
+    finally:
+        connection.close()
+        results.put(report)
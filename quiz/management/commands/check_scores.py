@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from quiz.bank import get_bank
+from quiz.models import Answer, QuizSession
+
+
+class Command(BaseCommand):
+    help = 'Verify the incrementally maintained quiz scores against a full regrade'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Store the regraded score and per-answer correctness where they differ (open sessions only)',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Also check submitted sessions; they are only reported, never fixed',
+        )
+
+    def handle(self, *args, **kwargs):
+        sessions = QuizSession.objects.order_by('id')
+        if not kwargs['all']:
+            sessions = sessions.filter(is_completed=False)
+
+        bank = get_bank()
+        checked = 0
+        mismatched = 0
+        fixed = 0
+        for quiz_session in sessions.iterator():
+            checked += 1
+            stored_score = quiz_session.score
+            regraded = quiz_session.calculate_score()
+
+            stale = [
+                answer for answer in quiz_session.answers.all()
+                if answer.is_correct != (bank.correct_option(answer.question_id) == answer.option)
+            ]
+            if regraded == stored_score and not stale:
+                continue
+
+            mismatched += 1
+            self.stdout.write(self.style.ERROR(
+                f'Session {quiz_session.id}: stored score {stored_score}, regraded {regraded}, '
+                f'{len(stale)} answers graded against an outdated question'
+            ))
+            # A submitted session's results are final: its graded slots and
+            # results page were built from the answers as they were then.
+            if kwargs['fix'] and not quiz_session.is_completed:
+                for answer in stale:
+                    answer.is_correct = not answer.is_correct
+                Answer.objects.bulk_update(stale, ['is_correct'])
+                QuizSession.objects.filter(id=quiz_session.id).update(score=regraded)
+                fixed += 1
+
+        if mismatched:
+            self.stdout.write(self.style.ERROR(f'{mismatched} of {checked} sessions inconsistent ({fixed} fixed)'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'All {checked} session scores match a full regrade'))
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from quiz.models import Answer, QuizSession
+
+
+class Command(BaseCommand):
+    help = 'Close every open quiz session whose deadline has passed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of sessions closed per transaction',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many sessions have expired',
+        )
+
+    def handle(self, *args, **kwargs):
+        now = timezone.now()
+        # Served by the partial index on open sessions' deadlines.
+        expired = QuizSession.objects.filter(is_completed=False, deadline__lte=now)
+
+        if kwargs['dry_run']:
+            self.stdout.write(f'{expired.count()} expired sessions')
+            return
+
+        closed = 0
+        while True:
+            with transaction.atomic():
+                sessions = list(expired.order_by('deadline')[:kwargs['batch_size']])
+                if not sessions:
+                    break
+
+                answers = {}
+                for session_id, question_id, option, is_correct in Answer.objects.filter(
+                    session__in=sessions,
+                ).values_list('session_id', 'question_id', 'option', 'is_correct'):
+                    answers.setdefault(session_id, {})[question_id] = (option, is_correct)
+
+                # Scores are already kept up to date as answers are saved.
+                for quiz_session in sessions:
+                    quiz_session.close(answers.get(quiz_session.id, {}), quiz_session.deadline)
+                QuizSession.objects.bulk_update(sessions, QuizSession.CLOSING_FIELDS)
+            closed += len(sessions)
+
+        self.stdout.write(self.style.SUCCESS(f'Closed {closed} expired sessions'))
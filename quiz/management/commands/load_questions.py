@@ -1,140 +1,215 @@
+from django.conf import settings
 from django.core.management.base import BaseCommand
-from quiz.models import Question
-import PyPDF2
-import re
+from quiz.extraction import count_pages, iter_pages
+from quiz.ingest import DEFAULT_BATCH_SIZE, open_checkpoint, replace_questions, sync_questions, write_batches
+from quiz.parsing import QuestionParser, parse_page_batches, parse_pages, parse_pdfs, source_name
+from quiz.pdf_cache import pdf_digest
+from quiz.profiling import ImportProfile
+import argparse
+import glob
+import os
 from pathlib import Path
 
 
+def page_range(value):
+    """Parse ``START:END``; either end may be left out."""
+    start, sep, end = value.partition(':')
+    try:
+        first_page = int(start) if start else 1
+        last_page = int(end) if end else None
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid page range {value!r}; expected START:END')
+    if not sep or first_page < 1 or (last_page is not None and last_page < first_page):
+        raise argparse.ArgumentTypeError(f'invalid page range {value!r}; expected START:END')
+    return first_page, last_page
+
+
 class Command(BaseCommand):
-    help = 'Load questions from PDF file'
+    help = 'Load questions from one or more PDF files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths',
+            nargs='*',
+            help='PDF files, directories of PDFs or glob patterns (default: simulator/questions.pdf)',
+        )
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=1,
+            help='Number of worker processes: one file each, or page ranges of a single file (0 = one per CPU)',
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only insert, update or delete questions whose content changed',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Number of questions written per INSERT statement',
+        )
+        parser.add_argument(
+            '--no-cache',
+            action='store_true',
+            help='Extract page text from the PDF even if a cached copy exists',
+        )
+        parser.add_argument(
+            '--profile',
+            metavar='PATH',
+            help="Write per-stage timings and counts as JSON to PATH ('-' for stdout)",
+        )
+        parser.add_argument(
+            '--cprofile',
+            metavar='PATH',
+            help='With --profile, also dump cProfile stats of the import to PATH',
+        )
+        parser.add_argument(
+            '--pages',
+            type=page_range,
+            metavar='START:END',
+            help='Only import questions starting on these pages, committing a checkpoint after each batch '
+                 'of pages. Questions are added or updated but never deleted',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue an interrupted --pages import (of the whole file if --pages is not given) '
+                 'from its last checkpoint',
+        )
+        parser.add_argument(
+            '--checkpoint-pages',
+            type=int,
+            default=50,
+            help='Number of pages imported between checkpoints',
+        )
 
     def handle(self, *args, **kwargs):
-        pdf_path = Path(__file__).resolve().parent.parent.parent.parent.parent / 'simulator' / 'questions.pdf'
-        
-        if not pdf_path.exists():
-            self.stdout.write(self.style.ERROR(f'PDF file not found at {pdf_path}'))
+        jobs = kwargs['jobs'] or os.cpu_count() or 1
+        cache = not kwargs['no_cache']
+        pdf_paths = self.resolve_paths(kwargs['paths'] or [str(settings.BASE_DIR / 'simulator' / 'questions.pdf')])
+
+        if not pdf_paths:
+            self.stdout.write(self.style.ERROR(f"No PDF files matched {' '.join(kwargs['paths'])}"))
             return
 
-        self.stdout.write(self.style.SUCCESS(f'Reading PDF from {pdf_path}'))
+        for pdf_path in pdf_paths:
+            if not pdf_path.exists():
+                self.stdout.write(self.style.ERROR(f'PDF file not found at {pdf_path}'))
+                return
+
+        sources = [source_name(path) for path in pdf_paths]
+        if len(set(sources)) != len(sources):
+            self.stdout.write(self.style.ERROR('Each PDF must have a distinct file name; it is used as the source bank'))
+            return
+
+        for path in pdf_paths:
+            self.stdout.write(self.style.SUCCESS(f'Reading PDF from {path}'))
         
+        profile = ImportProfile(enabled=bool(kwargs['profile']), cprofile_path=kwargs['cprofile'])
+        profile.start()
+
+        if kwargs['pages'] or kwargs['resume']:
+            if len(pdf_paths) > 1:
+                self.stdout.write(self.style.ERROR('--pages and --resume import a single PDF'))
+                return
+            self.import_page_range(pdf_paths[0], sources[0], jobs, cache, profile, kwargs)
+            return
+
         try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                full_text = ""
-                
-                for page in pdf_reader.pages:
-                    full_text += page.extract_text()
-
-            questions_data = self.parse_questions(full_text)
-            
-            Question.objects.all().delete()
-            
-            for q_data in questions_data:
-                Question.objects.create(**q_data)
-            
-            self.stdout.write(self.style.SUCCESS(f'Successfully loaded {len(questions_data)} questions'))
+            if len(pdf_paths) == 1:
+                # A single file streams straight into the database, with page
+                # extraction spread over the workers instead.
+                parser = QuestionParser(source=sources[0])
+                pages = iter_pages(pdf_paths[0], jobs=jobs, cache=cache)
+                questions = parse_pages(pages, parser, profile)
+            else:
+                questions = profile.timed('workers', parse_pdfs(pdf_paths, jobs=jobs, cache=cache, profile=profile))
+
+            # Time left over once the parsing stages are accounted for is
+            # hashing, diffing and the database writes.
+            with profile.stage('write'):
+                if kwargs['incremental']:
+                    summary = sync_questions(questions, sources=sources, batch_size=kwargs['batch_size'])
+                else:
+                    summary = replace_questions(questions, sources=sources, batch_size=kwargs['batch_size'])
+            profile.stop()
+            profile.add_counts(files=len(pdf_paths))
+            profile.add_summary(summary)
+
+            if kwargs['profile']:
+                profile.write(kwargs['profile'])
+
+            if not summary['parsed']:
+                self.stdout.write(self.style.ERROR('No questions were parsed; the question bank was left unchanged'))
+                return
+
+            self.stdout.write(self.style.SUCCESS(
+                f"Successfully loaded questions: {summary['created']} created, {summary['updated']} updated, "
+                f"{summary['deleted']} deleted, {summary['unchanged']} unchanged, "
+                f"{summary['duplicates']} duplicates skipped"
+            ))
+            self.stdout.write(f"Wrote {summary['rows_per_second']:.0f} rows/second")
             
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'Error: {str(e)}'))
 
-    def parse_questions(self, text):
-        questions = []
-        
-        lines = text.split('\n')
-        clean_lines = []
-        
-        for line in lines:
-            line = line.strip()
-            if line and not self.is_header_footer(line):
-                clean_lines.append(line)
-        
-        text = '\n'.join(clean_lines)
-        
-        question_pattern = r'Question\s*(\d+)[:\s]*(.+?)(?=Question\s*\d+|$)'
-        matches = re.finditer(question_pattern, text, re.DOTALL | re.IGNORECASE)
-        
-        for match in matches:
-            q_num = int(match.group(1))
-            q_content = match.group(2).strip()
-            
-            parsed = self.parse_single_question(q_num, q_content)
-            if parsed:
-                questions.append(parsed)
-        
-        return questions
+    def import_page_range(self, pdf_path, source, jobs, cache, profile, kwargs):
+        first_page, last_page = kwargs['pages'] or (1, None)
+        try:
+            total_pages = count_pages(pdf_path)
+            last_page = min(last_page or total_pages, total_pages)
+            checkpoint = open_checkpoint(source, pdf_digest(pdf_path), first_page, last_page, kwargs['resume'])
+            if checkpoint.is_completed:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Pages {first_page}-{last_page} were already imported ({checkpoint.questions_written} questions)'
+                ))
+                return
+            if checkpoint.next_page > first_page:
+                self.stdout.write(f'Resuming from page {checkpoint.next_page}')
 
-    def parse_single_question(self, q_num, content):
-        lines = [line.strip() for line in content.split('\n') if line.strip()]
-        
-        if len(lines) < 7:
-            return None
-        
-        question_text = lines[0]
-        
-        option_a = ""
-        option_b = ""
-        option_c = ""
-        option_d = ""
-        correct_option = ""
-        explanation = ""
-        
-        i = 1
-        while i < len(lines):
-            line = lines[i]
-            
-            if re.match(r'^[Aa][\.:\)]\s*', line):
-                option_a = re.sub(r'^[Aa][\.:\)]\s*', '', line).strip()
-            elif re.match(r'^[Bb][\.:\)]\s*', line):
-                option_b = re.sub(r'^[Bb][\.:\)]\s*', '', line).strip()
-            elif re.match(r'^[Cc][\.:\)]\s*', line):
-                option_c = re.sub(r'^[Cc][\.:\)]\s*', '', line).strip()
-            elif re.match(r'^[Dd][\.:\)]\s*', line):
-                option_d = re.sub(r'^[Dd][\.:\)]\s*', '', line).strip()
-            elif re.match(r'^(Correct\s*Answer|Answer)[:\s]*([A-Da-d])', line, re.IGNORECASE):
-                match = re.search(r'([A-Da-d])', line)
-                if match:
-                    correct_option = match.group(1).upper()
-            elif re.match(r'^(Explanation|Exp)[:\s]*', line, re.IGNORECASE):
-                explanation = re.sub(r'^(Explanation|Exp)[:\s]*', '', line, flags=re.IGNORECASE).strip()
-                j = i + 1
-                while j < len(lines) and not re.match(r'^Question\s*\d+', lines[j], re.IGNORECASE):
-                    if not re.match(r'^[A-Da-d][\.:\)]\s*', lines[j]) and not re.match(r'^(Correct\s*Answer|Answer)', lines[j], re.IGNORECASE):
-                        explanation += " " + lines[j]
-                    j += 1
-                break
-            
-            i += 1
-        
-        if not all([question_text, option_a, option_b, option_c, option_d, correct_option]):
-            return None
-        
-        if not explanation:
-            explanation = "No explanation provided."
-        
-        return {
-            'question_number': q_num,
-            'question_text': question_text,
-            'option_a': option_a,
-            'option_b': option_b,
-            'option_c': option_c,
-            'option_d': option_d,
-            'correct_option': correct_option,
-            'explanation': explanation.strip()
-        }
-
-    def is_header_footer(self, line):
-        header_footer_patterns = [
-            r'^\d+$',
-            r'^Page\s*\d+',
-            r'^\s*$',
-            r'^www\.',
-            r'\.com\s*$',
-            r'^Logo',
-            r'^Header',
-            r'^Footer',
-        ]
-        
-        for pattern in header_footer_patterns:
-            if re.match(pattern, line, re.IGNORECASE):
-                return True
-        return False
+            # Read from the page before, so a question whose separator ends
+            # that page is left to the previous range.
+            parser = QuestionParser(source=source, first_page=checkpoint.next_page, last_page=last_page)
+            pages = iter_pages(pdf_path, jobs=jobs, cache=cache,
+                               first_page=max(1, checkpoint.next_page - 1), last_page=last_page)
+            batches = parse_page_batches(profile.timed('extract', pages, count='pages'), parser,
+                                         kwargs['checkpoint_pages'])
+            with profile.stage('write'):
+                summary = write_batches(batches, checkpoint, batch_size=kwargs['batch_size'])
+            pages.close()
+            profile.stop()
+            profile.add_counts(files=1, lines=parser.lines, blocks=parser.blocks,
+                               parsed=parser.parsed, rejected=parser.rejected)
+            profile.add_summary(summary)
+
+            if kwargs['profile']:
+                profile.write(kwargs['profile'])
+
+            self.stdout.write(self.style.SUCCESS(
+                f"Successfully loaded pages {first_page}-{last_page}: {summary['created']} created, "
+                f"{summary['updated']} updated, {summary['unchanged']} unchanged, "
+                f"{summary['duplicates']} duplicates skipped"
+            ))
+            self.stdout.write(f"Wrote {summary['rows_per_second']:.0f} rows/second")
+
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'Error: {str(e)}'))
+            self.stdout.write(self.style.ERROR('Run the same command with --resume to continue from the last checkpoint'))
+
+    def resolve_paths(self, patterns):
+        pdf_paths = []
+        for pattern in patterns:
+            path = Path(pattern)
+            if path.is_dir():
+                matches = sorted(path.glob('*.pdf'))
+            elif glob.has_magic(pattern):
+                matches = sorted(Path(match) for match in glob.glob(pattern, recursive=True))
+            else:
+                matches = [path]
+
+            for match in matches:
+                if match not in pdf_paths:
+                    pdf_paths.append(match)
+        return pdf_paths
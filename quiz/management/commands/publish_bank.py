@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from quiz import bank_db
+import time
+
+
+class Command(BaseCommand):
+    help = 'Write the read-only question bank copy used when QUESTION_BANK_SEPARATE is on'
+
+    def handle(self, *args, **kwargs):
+        try:
+            started = time.perf_counter()
+            bank_db.publish()
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'Error publishing the question bank: {e}'))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Published version {bank_db.published_version()} of the question bank to '
+            f'{settings.QUESTION_BANK_DATABASE} in {time.perf_counter() - started:.2f}s'
+        ))
+        if not settings.QUESTION_BANK_SEPARATE:
+            self.stdout.write('QUESTION_BANK_SEPARATE is off, so questions are still read from the default database')
@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.http import FileResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from pathlib import Path
+import json
+import mimetypes
+import os
+import re
+
+
+# Accept-Encoding tokens, e.g. "gzip, deflate, br;q=0.8".
+ENCODING = re.compile(r'([a-z*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?', re.IGNORECASE)
+VARIANTS = (('br', '.br'), ('gzip', '.gz'))
+FAR_FUTURE = 365 * 24 * 60 * 60
+
+
+class PrecompressedStaticMiddleware:
+    """
+    Serve the files ``collectstatic`` gathered in ``STATIC_ROOT``, so
+    gunicorn can serve them without a web server in front. The brotli or
+    gzip copy written by ``quiz.storage`` is sent when the browser accepts
+    it, and content-hashed names are cached for a year, since their
+    content never changes. Other names are revalidated with their ETag.
+
+    Files are indexed when the worker starts, so only collected files are
+    ever served; restart the workers after running collectstatic.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = '/' + settings.STATIC_URL.lstrip('/')
+        self.files = {}
+        self.hashed = set()
+        if settings.STATIC_ROOT and os.path.isdir(settings.STATIC_ROOT):
+            self.index(Path(settings.STATIC_ROOT))
+
+    def index(self, root):
+        for path in root.rglob('*'):
+            if path.is_file() and path.suffix not in ('.gz', '.br'):
+                stat = path.stat()
+                encodings = tuple(
+                    encoding for encoding, suffix in VARIANTS if path.with_name(path.name + suffix).exists()
+                )
+                self.files[path.relative_to(root).as_posix()] = (path, stat.st_size, int(stat.st_mtime), encodings)
+        manifest = root / 'staticfiles.json'
+        if manifest.exists():
+            self.hashed = set(json.loads(manifest.read_text()).get('paths', {}).values())
+
+    def __call__(self, request):
+        if request.path.startswith(self.prefix) and request.method in ('GET', 'HEAD'):
+            name = request.path[len(self.prefix):]
+            entry = self.files.get(name)
+            if entry is not None:
+                return self.serve(request, name, *entry)
+        return self.get_response(request)
+
+    def serve(self, request, name, path, size, mtime, encodings):
+        accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        encoding = next((encoding for encoding in encodings if encoding in accepted), None)
+        # Each encoding is a different representation, so it gets its own ETag.
+        etag = f'"{size:x}-{mtime:x}{"-" + encoding if encoding else ""}"'
+
+        response = get_conditional_response(request, etag=etag, last_modified=mtime)
+        if response is None:
+            if encoding:
+                path = path.with_name(path.name + dict(VARIANTS)[encoding])
+            content_type, _ = mimetypes.guess_type(name)
+            response = FileResponse(open(path, 'rb'), content_type=content_type or 'application/octet-stream')
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+            response.headers.pop('Content-Disposition', None)
+
+        response.headers['ETag'] = etag
+        response.headers['Last-Modified'] = http_date(mtime)
+        patch_vary_headers(response, ['Accept-Encoding'])
+        if name in self.hashed:
+            response.headers['Cache-Control'] = f'public, max-age={FAR_FUTURE}, immutable'
+        else:
+            response.headers['Cache-Control'] = 'public, no-cache'
+        return response
+
+
+def accepted_encodings(header):
+    accepted = set()
+    for token, quality in ENCODING.findall(header):
+        try:
+            if quality and float(quality) <= 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(token.lower())
+    return accepted
@@ -0,0 +1,36 @@
+from django.db import migrations, models
+
+
+def tag_existing_questions(apps, schema_editor):
+    # Every question so far was imported from simulator/questions.pdf.
+    Question = apps.get_model('quiz', 'Question')
+    Question.objects.update(source='questions')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0002_question_content_hash'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='question',
+            options={'ordering': ['source', 'question_number']},
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='source',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.RunPython(tag_existing_questions, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='question',
+            name='question_number',
+            field=models.IntegerField(),
+        ),
+        migrations.AddConstraint(
+            model_name='question',
+            constraint=models.UniqueConstraint(fields=('source', 'question_number'), name='unique_question_per_source'),
+        ),
+    ]
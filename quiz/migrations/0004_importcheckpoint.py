@@ -0,0 +1,28 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0003_question_source'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=255)),
+                ('pdf_digest', models.CharField(max_length=64)),
+                ('first_page', models.IntegerField()),
+                ('last_page', models.IntegerField()),
+                ('next_page', models.IntegerField()),
+                ('questions_written', models.IntegerField(default=0)),
+                ('is_completed', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('pdf_digest', 'first_page', 'last_page'), name='unique_checkpoint_per_range')],
+            },
+        ),
+    ]
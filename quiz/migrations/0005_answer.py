@@ -0,0 +1,57 @@
+from django.db import migrations, models
+import django.db.models.deletion
+import json
+
+
+def copy_answers_to_table(apps, schema_editor):
+    QuizSession = apps.get_model('quiz', 'QuizSession')
+    Question = apps.get_model('quiz', 'Question')
+    Answer = apps.get_model('quiz', 'Answer')
+
+    question_ids = set(Question.objects.values_list('id', flat=True))
+    answers = []
+    for session_id, user_answers in QuizSession.objects.values_list('id', 'user_answers'):
+        for question_id, option in json.loads(user_answers or '{}').items():
+            # Skip answers to questions that have since been deleted.
+            if int(question_id) in question_ids and option in ('A', 'B', 'C', 'D'):
+                answers.append(Answer(session_id=session_id, question_id=int(question_id), option=option))
+    Answer.objects.bulk_create(answers, batch_size=500)
+
+
+def copy_answers_to_json(apps, schema_editor):
+    QuizSession = apps.get_model('quiz', 'QuizSession')
+    Answer = apps.get_model('quiz', 'Answer')
+
+    answers = {}
+    for session_id, question_id, option in Answer.objects.values_list('session_id', 'question_id', 'option'):
+        answers.setdefault(session_id, {})[str(question_id)] = option
+    for session_id, user_answers in answers.items():
+        QuizSession.objects.filter(id=session_id).update(user_answers=json.dumps(user_answers))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0004_importcheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Answer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('option', models.CharField(choices=[('A', 'A'), ('B', 'B'), ('C', 'C'), ('D', 'D')], max_length=1)),
+                ('answered_at', models.DateTimeField(auto_now=True)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='quiz.question')),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='quiz.quizsession')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('session', 'question'), name='unique_answer_per_question')],
+            },
+        ),
+        migrations.RunPython(copy_answers_to_table, copy_answers_to_json),
+        migrations.RemoveField(
+            model_name='quizsession',
+            name='user_answers',
+        ),
+    ]
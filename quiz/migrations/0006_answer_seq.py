@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0005_answer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='answer',
+            name='seq',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
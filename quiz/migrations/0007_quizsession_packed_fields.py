@@ -0,0 +1,67 @@
+from django.db import migrations, models
+import json
+import struct
+
+
+def pack_ids(ids):
+    width = 4 if max(ids, default=0) < 2 ** 32 else 8
+    return bytes([width]) + struct.pack(f"<{len(ids)}{'I' if width == 4 else 'Q'}", *ids)
+
+
+def unpack_ids(data):
+    data = bytes(data)
+    if not data:
+        return []
+    width = data[0]
+    return list(struct.unpack(f"<{(len(data) - 1) // width}{'I' if width == 4 else 'Q'}", data[1:]))
+
+
+def pack_sessions(apps, schema_editor):
+    QuizSession = apps.get_model('quiz', 'QuizSession')
+    Answer = apps.get_model('quiz', 'Answer')
+
+    for session in QuizSession.objects.all():
+        question_ids = json.loads(session.selected_questions or '[]')
+        session.question_order = pack_ids(question_ids)
+        if session.is_completed:
+            answers = dict(Answer.objects.filter(session_id=session.id).values_list('question_id', 'option'))
+            session.answer_slots = ''.join(answers.get(question_id, '-') for question_id in question_ids).encode('ascii')
+        session.save(update_fields=['question_order', 'answer_slots'])
+
+
+def unpack_sessions(apps, schema_editor):
+    QuizSession = apps.get_model('quiz', 'QuizSession')
+
+    for session in QuizSession.objects.all():
+        session.selected_questions = json.dumps(unpack_ids(session.question_order))
+        session.save(update_fields=['selected_questions'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0006_answer_seq'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizsession',
+            name='question_order',
+            field=models.BinaryField(default=b''),
+        ),
+        migrations.AddField(
+            model_name='quizsession',
+            name='answer_slots',
+            field=models.BinaryField(blank=True, default=b''),
+        ),
+        migrations.AlterField(
+            model_name='quizsession',
+            name='selected_questions',
+            field=models.TextField(default='[]'),
+        ),
+        migrations.RunPython(pack_sessions, unpack_sessions),
+        migrations.RemoveField(
+            model_name='quizsession',
+            name='selected_questions',
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+
+def create_version(apps, schema_editor):
+    QuestionBankVersion = apps.get_model('quiz', 'QuestionBankVersion')
+    QuestionBankVersion.objects.get_or_create(id=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0007_quizsession_packed_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionBankVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.IntegerField(default=1)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(create_version, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+
+def grade_answers(apps, schema_editor):
+    Answer = apps.get_model('quiz', 'Answer')
+    Question = apps.get_model('quiz', 'Question')
+    QuizSession = apps.get_model('quiz', 'QuizSession')
+
+    correct_options = dict(Question.objects.values_list('id', 'correct_option'))
+    correct_answers = {}
+    for answer in Answer.objects.all():
+        answer.is_correct = correct_options.get(answer.question_id) == answer.option
+        answer.save(update_fields=['is_correct'])
+        correct_answers[answer.session_id] = correct_answers.get(answer.session_id, 0) + answer.is_correct
+
+    # Completed sessions keep the score they were submitted with.
+    for session in QuizSession.objects.filter(is_completed=False):
+        session.score = correct_answers.get(session.id, 0)
+        session.save(update_fields=['score'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0008_questionbankversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='answer',
+            name='is_correct',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(grade_answers, migrations.RunPython.noop),
+    ]
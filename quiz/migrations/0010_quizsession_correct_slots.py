@@ -0,0 +1,38 @@
+from django.db import migrations, models
+import struct
+
+
+def unpack_ids(data):
+    data = bytes(data)
+    if not data:
+        return []
+    width = data[0]
+    return list(struct.unpack(f"<{(len(data) - 1) // width}{'I' if width == 4 else 'Q'}", data[1:]))
+
+
+def grade_completed_sessions(apps, schema_editor):
+    QuizSession = apps.get_model('quiz', 'QuizSession')
+    Answer = apps.get_model('quiz', 'Answer')
+
+    for session in QuizSession.objects.filter(is_completed=True):
+        correct = set(Answer.objects.filter(session_id=session.id, is_correct=True).values_list('question_id', flat=True))
+        session.correct_slots = bytes(
+            ord('1') if question_id in correct else ord('0') for question_id in unpack_ids(session.question_order)
+        )
+        session.save(update_fields=['correct_slots'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0009_answer_is_correct'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizsession',
+            name='correct_slots',
+            field=models.BinaryField(blank=True, default=b''),
+        ),
+        migrations.RunPython(grade_completed_sessions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0010_quizsession_correct_slots'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizsession',
+            name='seed',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
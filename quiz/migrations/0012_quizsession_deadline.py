@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def set_deadlines(apps, schema_editor):
+    # Every exam so far was one hour long.
+    QuizSession = apps.get_model('quiz', 'QuizSession')
+    QuizSession.objects.update(deadline=F('start_time') + timedelta(hours=1))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0011_quizsession_seed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizsession',
+            name='deadline',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(set_deadlines, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='quizsession',
+            name='deadline',
+            field=models.DateTimeField(),
+        ),
+        migrations.AddIndex(
+            model_name='quizsession',
+            index=models.Index(condition=models.Q(('is_completed', False)), fields=['deadline'], name='open_session_deadline_idx'),
+        ),
+    ]
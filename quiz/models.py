@@ -1,9 +1,30 @@
-from django.db import models
-import json
+from django.db import models, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+import struct
+import time
+
+
+UNANSWERED = '-'
+
+
+def pack_ids(ids):
+    """Pack ids into a width byte followed by little-endian unsigned integers."""
+    width = 4 if max(ids, default=0) < 2 ** 32 else 8
+    return bytes([width]) + struct.pack(f"<{len(ids)}{'I' if width == 4 else 'Q'}", *ids)
+
+
+def unpack_ids(data):
+    data = bytes(data)
+    if not data:
+        return []
+    width = data[0]
+    return list(struct.unpack(f"<{(len(data) - 1) // width}{'I' if width == 4 else 'Q'}", data[1:]))
 
 
 class Question(models.Model):
-    question_number = models.IntegerField(unique=True)
+    source = models.CharField(max_length=255, blank=True, default='')
+    question_number = models.IntegerField()
     question_text = models.TextField()
     option_a = models.TextField()
     option_b = models.TextField()
@@ -11,50 +32,271 @@ class Question(models.Model):
     option_d = models.TextField()
     correct_option = models.CharField(max_length=1, choices=[('A', 'A'), ('B', 'B'), ('C', 'C'), ('D', 'D')])
     explanation = models.TextField()
+    content_hash = models.CharField(max_length=64, blank=True, default='')
 
     class Meta:
-        ordering = ['question_number']
+        ordering = ['source', 'question_number']
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'question_number'], name='unique_question_per_source'),
+        ]
 
     def __str__(self):
         return f"Question {self.question_number}"
 
 
+class QuestionBankVersion(models.Model):
+    """Single row bumped whenever the question bank changes; see ``quiz.bank``."""
+    version = models.IntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @classmethod
+    def current(cls):
+        return cls.objects.filter(id=1).values_list('version', flat=True).first() or 0
+
+    @classmethod
+    def bump(cls):
+        if not cls.objects.filter(id=1).update(version=F('version') + 1, updated_at=timezone.now()):
+            cls.objects.get_or_create(id=1)
+
+
+class ImportCheckpoint(models.Model):
+    """Progress of a page-range import, committed together with each batch of questions."""
+    source = models.CharField(max_length=255)
+    pdf_digest = models.CharField(max_length=64)
+    first_page = models.IntegerField()
+    last_page = models.IntegerField()
+    next_page = models.IntegerField()
+    questions_written = models.IntegerField(default=0)
+    is_completed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['pdf_digest', 'first_page', 'last_page'], name='unique_checkpoint_per_range'),
+        ]
+
+    def __str__(self):
+        return f"{self.source} pages {self.first_page}-{self.last_page}"
+
+
 class QuizSession(models.Model):
     start_time = models.DateTimeField(auto_now_add=True)
+    deadline = models.DateTimeField()
     end_time = models.DateTimeField(null=True, blank=True)
-    selected_questions = models.TextField()
-    user_answers = models.TextField(default='{}')
+    # Question ids in exam order, packed by ``pack_ids``.
+    question_order = models.BinaryField(default=b'')
+    # One byte per position once the session is completed: the chosen
+    # option, or UNANSWERED.
+    answer_slots = models.BinaryField(default=b'', blank=True)
+    # Graded alongside ``answer_slots``: b'1' per correctly answered position, b'0' otherwise.
+    correct_slots = models.BinaryField(default=b'', blank=True)
+    # Seed the question order was drawn with; see quiz.bank.assemble_exam.
+    seed = models.BigIntegerField(null=True, blank=True)
     score = models.IntegerField(default=0)
     is_completed = models.BooleanField(default=False)
     current_question_index = models.IntegerField(default=0)
 
+    class Meta:
+        indexes = [
+            # Only open sessions can expire, so only they are indexed.
+            models.Index(fields=['deadline'], condition=Q(is_completed=False), name='open_session_deadline_idx'),
+        ]
+
     def set_selected_questions(self, questions_list):
-        self.selected_questions = json.dumps(questions_list)
+        self.question_order = pack_ids(questions_list)
+        self._selected_questions = list(questions_list)
 
     def get_selected_questions(self):
-        return json.loads(self.selected_questions)
+        if getattr(self, '_selected_questions', None) is None:
+            self._selected_questions = unpack_ids(self.question_order)
+        return self._selected_questions
+
+    def refresh_from_db(self, *args, **kwargs):
+        self._selected_questions = None
+        super().refresh_from_db(*args, **kwargs)
 
     def set_user_answer(self, question_id, answer):
-        answers = json.loads(self.user_answers)
-        answers[str(question_id)] = answer
-        self.user_answers = json.dumps(answers)
+        Answer.record(self.id, question_id, answer)
+
+    def get_answer_slots(self):
+        """The chosen option per position ('' if unanswered)."""
+        if self.answer_slots:
+            return ['' if slot == UNANSWERED else slot for slot in bytes(self.answer_slots).decode('ascii')]
+        answers = dict(self.answers.values_list('question_id', 'option'))
+        return [answers.get(question_id, '') for question_id in self.get_selected_questions()]
 
     def get_user_answers(self):
-        return json.loads(self.user_answers)
+        if self.answer_slots:
+            return {
+                str(question_id): option
+                for question_id, option in zip(self.get_selected_questions(), self.get_answer_slots())
+                if option
+            }
+        return {str(question_id): option for question_id, option in self.answers.values_list('question_id', 'option')}
+
+    def get_user_answer(self, question_id):
+        return self.answers.filter(question_id=question_id).values_list('option', flat=True).first() or ''
+
+    def get_correct_slots(self):
+        """Whether each position was answered correctly."""
+        if self.correct_slots:
+            return [slot == ord('1') for slot in bytes(self.correct_slots)]
+        correct = set(self.answers.filter(is_correct=True).values_list('question_id', flat=True))
+        return [question_id in correct for question_id in self.get_selected_questions()]
+
+    def get_results(self):
+        """``(question_id, user_answer, is_correct)`` per position, from the graded slots."""
+        return list(zip(self.get_selected_questions(), self.get_answer_slots(), self.get_correct_slots()))
+
+    def complete(self):
+        """
+        Close the session and materialize its graded results into
+        ``answer_slots`` and ``correct_slots``, so the results pages never
+        need to regrade. The score is already up to date; it is kept as
+        answers are saved.
+        """
+        # One transaction, so an answer saved concurrently is either in the
+        # slots as well as the score, or rejected because the session closed.
+        with transaction.atomic():
+            # Waits for saves in progress; see record_changes.
+            QuizSession.objects.select_for_update().filter(id=self.id).values_list('id', flat=True).first()
+            answers = {
+                question_id: (option, is_correct)
+                for question_id, option, is_correct in self.answers.values_list('question_id', 'option', 'is_correct')
+            }
+            self.close(answers, timezone.now())
+            # ``score`` is only ever changed with UPDATEs while the session is open.
+            self.save(update_fields=self.CLOSING_FIELDS)
+
+    CLOSING_FIELDS = ['end_time', 'is_completed', 'answer_slots', 'correct_slots']
+
+    def close(self, answers, end_time):
+        """
+        Set the ``CLOSING_FIELDS`` from ``answers``, a dict of question id
+        to ``(option, is_correct)``, without saving.
+        """
+        graded = [answers.get(question_id, (UNANSWERED, False)) for question_id in self.get_selected_questions()]
+
+        self.end_time = end_time
+        self.is_completed = True
+        self.answer_slots = ''.join(option for option, _ in graded).encode('ascii')
+        self.correct_slots = bytes(ord('1') if is_correct else ord('0') for _, is_correct in graded)
 
     def calculate_score(self):
-        answers = self.get_user_answers()
-        selected_questions = self.get_selected_questions()
-        questions = Question.objects.filter(id__in=selected_questions)
-        
-        correct_count = 0
-        for question in questions:
-            user_answer = answers.get(str(question.id))
-            if user_answer == question.correct_option:
-                correct_count += 1
-        
+        """Regrade every answer from scratch; see the check_scores command."""
+        from .bank import get_bank
+
+        bank = get_bank()
+        selected_questions = set(self.get_selected_questions())
+        correct_count = sum(
+            1 for question_id, option in self.answers.values_list('question_id', 'option')
+            if question_id in selected_questions and bank.correct_option(question_id) == option
+        )
+
         self.score = correct_count
         return correct_count
 
     def __str__(self):
-        return f"Quiz Session {self.id} - Score: {self.score}/50"
+        return f"Quiz Session {self.id} - Score: {self.score}/{len(self.get_selected_questions())}"
+
+
+class Answer(models.Model):
+    """One row per answered question, so saving an answer never rewrites the session."""
+    session = models.ForeignKey(QuizSession, on_delete=models.CASCADE, related_name='answers')
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='+')
+    option = models.CharField(max_length=1, choices=[('A', 'A'), ('B', 'B'), ('C', 'C'), ('D', 'D')])
+    # Client-side sequence number of the change that set ``option``.
+    seq = models.BigIntegerField(default=0)
+    # Graded when saved; QuizSession.score is the count of these.
+    is_correct = models.BooleanField(default=False)
+    answered_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['session', 'question'], name='unique_answer_per_question'),
+        ]
+
+    @classmethod
+    def record(cls, session_id, question_id, option):
+        return cls.record_changes(session_id, [cls.change(question_id, option)])
+
+    @staticmethod
+    def change(question_id, option):
+        # Stamped like quiz.js's sequence numbers, so it beats any earlier batched change.
+        return {'question_id': int(question_id), 'answer': option, 'seq': int(time.time() * 1000)}
+
+    @staticmethod
+    def latest_changes(changes):
+        """The last change per question id, in an ordered list of changes."""
+        latest = {}
+        for change in changes:
+            current = latest.get(change['question_id'])
+            if current is None or change['seq'] >= current['seq']:
+                latest[change['question_id']] = change
+        return latest
+
+    @classmethod
+    def record_changes(cls, session_id, changes):
+        """
+        Apply an ordered list of ``{question_id, answer, seq}`` changes in
+        one transaction. Only the last change per question is written, and
+        changes older than the stored answer's ``seq`` are ignored, so a
+        late-arriving batch can't undo a newer answer. Changes to questions
+        outside the session are dropped.
+
+        Each answer is graded as it is written and the session's score is
+        adjusted by the difference, so it never needs a full regrade.
+        Returns the number of answers written; raises
+        ``QuizSession.DoesNotExist`` for a missing or completed session.
+        """
+        from .bank import get_bank
+
+        latest = cls.latest_changes(changes)
+        bank = get_bank()
+        with transaction.atomic():
+            # The stored seq/is_correct read below, the upsert and the score
+            # delta must not interleave with another save or with complete().
+            # The session row lock serializes them on databases with row
+            # locks; SQLite ignores it and relies on the IMMEDIATE
+            # transaction_mode in settings, which takes the write lock at BEGIN.
+            question_order = (
+                QuizSession.objects.select_for_update().filter(id=session_id, is_completed=False)
+                .values_list('question_order', flat=True).first()
+            )
+            if question_order is None:
+                raise QuizSession.DoesNotExist(f'No open quiz session {session_id}')
+            selected_questions = set(unpack_ids(question_order))
+
+            stored = {
+                question_id: (seq, is_correct)
+                for question_id, seq, is_correct in cls.objects.filter(
+                    session_id=session_id, question_id__in=latest,
+                ).values_list('question_id', 'seq', 'is_correct')
+            }
+            answers = []
+            score_change = 0
+            for question_id, change in latest.items():
+                if question_id not in selected_questions:
+                    continue
+                previous_seq, was_correct = stored.get(question_id, (-1, False))
+                if change['seq'] <= previous_seq:
+                    continue
+                is_correct = bank.correct_option(question_id) == change['answer']
+                score_change += is_correct - was_correct
+                answers.append(cls(
+                    session_id=session_id, question_id=question_id, option=change['answer'],
+                    seq=change['seq'], is_correct=is_correct,
+                ))
+
+            cls.objects.bulk_create(
+                answers,
+                update_conflicts=True,
+                unique_fields=['session', 'question'],
+                update_fields=['option', 'seq', 'is_correct', 'answered_at'],
+            )
+            if score_change:
+                QuizSession.objects.filter(id=session_id).update(score=F('score') + score_change)
+        return len(answers)
+
+    def __str__(self):
+        return f"Session {self.session_id} - Question {self.question_id}: {self.option}"
@@ -0,0 +1,343 @@
+"""
+Question-bank parser shared by every importer.
+
+Handles both layouts found in our PDFs:
+
+    Question 12: Which ...            ************
+    A. ...                            12: Which ...
+    B) ...                            A: ...
+    Correct Answer: C                 ...
+    Explanation: ...                  Correct Answer: C
+                                      Explanation: ...
+                                      ECO Domain Task: I.6
+
+Lines are classified with a handful of precompiled patterns and fed through a
+small state machine, one line at a time, so parsing needs a single pass over
+the text and never holds more than the question being assembled.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import re
+
+from .extraction import iter_pages
+from .profiling import ImportProfile
+
+
+# A bare ``Question :`` is a running header on some pages, not a heading.
+NOISE = re.compile(r'(?:\d+(?:\s+www\.\S+)?$|Page\s*\d+|www\.|Logo|Header|Footer|Question\s*:?$)', re.IGNORECASE)
+SEPARATOR = re.compile(r'\*{3,}')
+HEADING = re.compile(r'^Question\s*(\d+)\s*[:.)]?\s*', re.IGNORECASE)
+NUMBER_PREFIX = re.compile(r'^(\d+)\s*[:.]?\s+')
+OPTION = re.compile(r'^([A-Da-d])\s*[.:)]\s*')
+INLINE_OPTION = re.compile(r'\s{2,}(?=[A-D]\s*[.:)](?:\s|$))')
+ANSWER = re.compile(r'^(?:Correct\s*Answer|Answer)\s*[:\s]\s*([A-Da-d])\b', re.IGNORECASE)
+EXPLANATION = re.compile(r'^(?:Explanation|Exp)\b[.:]?\s*', re.IGNORECASE)
+DOMAIN = re.compile(r'^ECO\s+Domain\s+Task\s*:', re.IGNORECASE)
+
+# Parser states
+TEXT, OPTIONS, EXPLAINING, DONE = range(4)
+
+
+def is_noise(line):
+    """Page furniture: page numbers, running headers/footers and site URLs."""
+    return NOISE.match(line) is not None or line[-4:].lower() == '.com'
+
+
+class QuestionParser:
+    """
+    Incremental parser: ``feed`` it cleaned lines and each question dict
+    is appended to ``ready`` as soon as the next question boundary is seen.
+    Call ``close`` at the end of input to flush the last question.
+
+    A question belongs to the page its block starts on: the page of its
+    separator or heading. With ``first_page``/``last_page`` only questions
+    starting in that range are kept, and ``past_end`` is set once a block
+    starts after ``last_page``, so a page range can be parsed on its own.
+
+    A question without a printed number is numbered by its position among
+    the questions parsed so far. That position depends on where parsing
+    started, so such questions are rejected when parsing a page range,
+    where the number could overwrite a different question's.
+    """
+
+    def __init__(self, source='', first_page=1, last_page=None):
+        self.source = source
+        self.first_page = first_page
+        self.last_page = last_page
+        self.page_range = first_page > 1 or last_page is not None
+        self.lines = 0
+        self.blocks = 0
+        self.parsed = 0
+        self.rejected = 0
+        self.block_start_page = None
+        self.boundary_page = None
+        self.past_end = False
+        self.ready = []
+        # The page each question in ``ready`` starts on.
+        self.ready_pages = []
+        self._reset()
+
+    def _reset(self):
+        self.number = None
+        self.text = []
+        self.options = {}
+        self.option = None
+        self.correct_option = ''
+        self.explanation = []
+        self.state = TEXT
+        self.started = False
+
+    def feed(self, line, page_number=None):
+        self.lines += 1
+
+        if '*' in line and SEPARATOR.search(line):
+            # Separators may share a line with text on either side.
+            for index, part in enumerate(SEPARATOR.split(line)):
+                if index > 0:
+                    self._finish()
+                    self.boundary_page = page_number
+                part = part.strip()
+                if part:
+                    self._feed(part, page_number)
+        else:
+            self._feed(line, page_number)
+
+    def close(self):
+        self._finish()
+
+    def _feed(self, line, page_number):
+        first = line[0]
+        heading = HEADING.match(line) if first in 'Qq' else None
+        if heading:
+            self._finish()
+            self._start(page_number)
+            self.number = int(heading.group(1))
+            line = line[heading.end():]
+            if not line:
+                return
+            first = line[0]
+        elif not self.started:
+            self._start(page_number)
+
+        if self.state == DONE:
+            return
+
+        if first in 'Ee' and DOMAIN.match(line):
+            self.state = DONE
+            return
+
+        option = OPTION.match(line)
+        if (option or self.state == OPTIONS) and self.state != EXPLAINING:
+            # PDF extraction sometimes runs the next option onto the same line.
+            parts = INLINE_OPTION.split(line)
+            if len(parts) > 1:
+                for part in parts:
+                    self._feed(part, page_number)
+                return
+
+        if option and self.state != EXPLAINING:
+            self.option = option.group(1).upper()
+            self.options[self.option] = [line[option.end():]]
+            self.state = OPTIONS
+            return
+
+        answer = ANSWER.match(line) if first in 'AaCc' else None
+        if answer and self.state == OPTIONS:
+            self.correct_option = answer.group(1).upper()
+            self.option = None
+            return
+
+        explanation = EXPLANATION.match(line) if first in 'Ee' else None
+        if explanation and self.state == OPTIONS:
+            self.explanation.append(line[explanation.end():])
+            self.state = EXPLAINING
+            return
+
+        if self.state == EXPLAINING:
+            self.explanation.append(line)
+        elif self.state == OPTIONS:
+            # Wrapped option text continues the last option.
+            if self.option:
+                self.options[self.option].append(line)
+        else:
+            if not self.text and self.number is None:
+                prefix = NUMBER_PREFIX.match(line)
+                if prefix:
+                    self.number = int(prefix.group(1))
+                    line = line[prefix.end():]
+            self.text.append(line)
+
+    def _start(self, page_number):
+        self.started = True
+        self.block_start_page = page_number if self.boundary_page is None else self.boundary_page
+        self.boundary_page = None
+        if self.last_page is not None and self.block_start_page > self.last_page:
+            self.past_end = True
+
+    def _in_range(self):
+        page = self.block_start_page
+        if page is None:
+            return True
+        return page >= self.first_page and (self.last_page is None or page <= self.last_page)
+
+    def _finish(self):
+        if not self.started:
+            return
+
+        if not self._in_range():
+            # Belongs to a neighbouring page range.
+            self._reset()
+            return
+
+        self.blocks += 1
+        question = self._build()
+        self._reset()
+        if question is None:
+            self.rejected += 1
+        else:
+            self.parsed += 1
+            self.ready.append(question)
+            self.ready_pages.append(self.block_start_page)
+
+    def _build(self):
+        question_text = normalize(self.text)
+        options = {letter: normalize(self.options.get(letter, ())) for letter in 'ABCD'}
+
+        if not question_text or not all(options.values()) or not self.correct_option:
+            return None
+        if self.number is None and self.page_range:
+            return None
+
+        return {
+            'source': self.source,
+            'question_number': self.number if self.number is not None else self.parsed + 1,
+            'question_text': question_text,
+            'option_a': options['A'],
+            'option_b': options['B'],
+            'option_c': options['C'],
+            'option_d': options['D'],
+            'correct_option': self.correct_option,
+            'explanation': normalize(self.explanation) or 'No explanation provided.',
+        }
+
+
+def normalize(parts):
+    # Collapses runs of whitespace, including the odd spacing PyPDF2 emits.
+    return ' '.join(' '.join(parts).split())
+
+
+def clean_lines(pages):
+    """Yield ``(page_number, line)`` for every line that isn't blank or page furniture."""
+    for page_number, text in pages:
+        for line in text.split('\n'):
+            line = line.strip()
+            if line and not is_noise(line):
+                yield page_number, line
+
+
+def parse_lines(lines, parser):
+    for page_number, line in lines:
+        parser.feed(line, page_number)
+        if parser.ready:
+            yield from parser.ready
+            parser.ready.clear()
+            parser.ready_pages.clear()
+
+    parser.close()
+    yield from parser.ready
+    parser.ready.clear()
+    parser.ready_pages.clear()
+
+
+def parse_page_batches(pages, parser, batch_pages):
+    """
+    Parse ``pages`` in batches of about ``batch_pages`` pages, yielding
+    ``(questions, next_page)`` where ``questions`` are exactly those
+    starting before ``next_page`` not yielded yet, so resuming from
+    ``next_page`` parses each question once. The last batch has a
+    ``next_page`` of None. Stops reading as soon as the parser is past its
+    last page.
+    """
+    # (start page, question) pairs not yielded yet.
+    pending = []
+    batch_start = parser.first_page
+    for page_number, text in pages:
+        for _, line in clean_lines([(page_number, text)]):
+            parser.feed(line, page_number)
+        pending.extend(zip(parser.ready_pages, parser.ready))
+        parser.ready.clear()
+        parser.ready_pages.clear()
+        if parser.past_end:
+            break
+
+        # Everything before the block still being read is complete; a
+        # trailing separator already belongs to the next block.
+        if parser.started:
+            next_page = parser.block_start_page
+        elif parser.boundary_page is not None:
+            next_page = parser.boundary_page
+        else:
+            next_page = page_number + 1
+        next_page = max(next_page, parser.first_page)
+        if next_page - batch_start >= batch_pages:
+            # Questions already finished on ``next_page`` go with the rest
+            # of that page, which a resumed import parses again.
+            yield [question for page, question in pending if page < next_page], next_page
+            pending = [(page, question) for page, question in pending if page >= next_page]
+            batch_start = next_page
+
+    parser.close()
+    pending.extend(zip(parser.ready_pages, parser.ready))
+    parser.ready.clear()
+    parser.ready_pages.clear()
+    yield [question for _, question in pending], None
+
+
+def parse_pages(pages, parser=None, profile=None):
+    """
+    Yield question dicts parsed from ``(page_number, text)`` pairs. Pass a
+    ``QuestionParser`` to inspect its counters afterwards, and an
+    ``ImportProfile`` to time extraction, cleaning and parsing separately.
+    """
+    if parser is None:
+        parser = QuestionParser()
+
+    if profile is None or not profile.enabled:
+        yield from parse_lines(clean_lines(pages), parser)
+        return
+
+    lines = profile.timed('clean', clean_lines(profile.timed('extract', pages, count='pages')))
+    yield from profile.timed('parse', parse_lines(lines, parser))
+    profile.add_counts(lines=parser.lines, blocks=parser.blocks, parsed=parser.parsed, rejected=parser.rejected)
+
+
+def source_name(pdf_path):
+    """Questions are tagged with the bank they came from: the PDF's file name."""
+    return Path(pdf_path).stem
+
+
+def parse_pdf(pdf_path, cache=True, profile=False):
+    """
+    Parse a whole PDF; used as the per-file worker for multi-PDF imports.
+    Returns the questions and, with ``profile``, the worker's stage report.
+    """
+    parser = QuestionParser(source=source_name(pdf_path))
+    worker_profile = ImportProfile(enabled=profile)
+    questions = list(parse_pages(iter_pages(pdf_path, cache=cache), parser, worker_profile))
+    return questions, worker_profile.report() if profile else None
+
+
+def parse_pdfs(pdf_paths, jobs=1, cache=True, profile=None):
+    """
+    Parse each PDF in its own worker process, yielding its questions as
+    soon as that file is done, so the total time tracks the largest file.
+    Worker stage times and counts are merged into ``profile``.
+    """
+    profiling = profile is not None and profile.enabled
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(parse_pdf, str(pdf_path), cache, profiling) for pdf_path in pdf_paths]
+        for future in as_completed(futures):
+            questions, report = future.result()
+            if report:
+                profile.merge(report)
+            yield from questions
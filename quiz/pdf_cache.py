@@ -0,0 +1,133 @@
+"""
+Persistent cache of extracted PDF page text.
+
+Extraction is by far the slowest part of an import, and its output only
+depends on the PDF bytes and the PyPDF2 version, so entries are keyed by
+both. Each entry is a single file holding the UTF-8 text of every page back
+to back, followed by ``pages + 1`` little-endian uint64 offsets and the page
+count. Entries are read through ``mmap`` so a page is only decoded when it is
+consumed, and the least recently used entries are evicted once the cache
+grows past ``PDF_TEXT_CACHE_MAX_BYTES``.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+from pathlib import Path
+
+import PyPDF2
+from django.conf import settings
+
+
+OFFSET = struct.Struct('<Q')
+
+
+def pdf_digest(pdf_path):
+    digest = hashlib.sha256()
+    with open(pdf_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PageTextCache:
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = Path(directory or settings.PDF_TEXT_CACHE_DIR)
+        self.max_bytes = settings.PDF_TEXT_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+
+    def key(self, pdf_path):
+        return f'{pdf_digest(pdf_path)}-pypdf2-{PyPDF2.__version__}'
+
+    def path(self, key):
+        return self.directory / f'{key}.pages'
+
+    def read(self, key, first_page=1):
+        """
+        Return a generator of ``(page_number, text)`` for a cached entry,
+        starting at ``first_page``, or None on a miss.
+        """
+        path = self.path(key)
+        try:
+            file = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+
+        with file:
+            try:
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                mapped = None
+        offsets = self._offsets(mapped)
+        if offsets is None:
+            # Truncated or otherwise unreadable; extract again.
+            if mapped is not None:
+                mapped.close()
+            path.unlink(missing_ok=True)
+            return None
+
+        # Touch the entry so eviction treats it as recently used.
+        os.utime(path)
+        return self._iter_pages(mapped, offsets, first_page)
+
+    def _offsets(self, mapped):
+        if mapped is None or len(mapped) < OFFSET.size:
+            return None
+        (page_count,) = OFFSET.unpack_from(mapped, len(mapped) - OFFSET.size)
+        index_start = len(mapped) - OFFSET.size * (page_count + 2)
+        if index_start < 0:
+            return None
+        offsets = struct.unpack_from(f'<{page_count + 1}Q', mapped, index_start)
+        if offsets[-1] != index_start:
+            return None
+        return offsets
+
+    def _iter_pages(self, mapped, offsets, first_page):
+        try:
+            for index in range(first_page - 1, len(offsets) - 1):
+                text = mapped[offsets[index]:offsets[index + 1]].decode('utf-8', 'surrogatepass')
+                yield index + 1, text
+        finally:
+            mapped.close()
+
+    def store(self, key, pages):
+        """
+        Pass ``pages`` through unchanged while writing them to the cache.
+        The entry only becomes visible once every page has been consumed.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        offsets = [0]
+        stored = False
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                for page_number, text in pages:
+                    data = text.encode('utf-8', 'surrogatepass')
+                    file.write(data)
+                    offsets.append(offsets[-1] + len(data))
+                    yield page_number, text
+                file.write(struct.pack(f'<{len(offsets)}Q', *offsets))
+                file.write(OFFSET.pack(len(offsets) - 1))
+            os.replace(tmp_path, self.path(key))
+            stored = True
+        finally:
+            if not stored:
+                Path(tmp_path).unlink(missing_ok=True)
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for path in self.directory.glob('*.pages'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
@@ -0,0 +1,133 @@
+"""
+Per-stage timing for question imports.
+
+The import pipeline is a chain of generators, so one ``next()`` on the last
+stage runs code in every stage before it. ``ImportProfile`` keeps a stack of
+active stages and only charges each stage for the time spent in its own
+code, which makes the stage totals add up to the import's wall time.
+"""
+from contextlib import contextmanager
+import cProfile
+import json
+import sys
+import time
+
+
+class ImportProfile:
+
+    def __init__(self, enabled=True, cprofile_path=None):
+        self.enabled = enabled
+        self.cprofile_path = cprofile_path
+        self.stages = {}
+        self.counts = {}
+        self._stack = []
+        self._profiler = None
+        self._started = None
+        self.total = None
+
+    def start(self):
+        if not self.enabled:
+            return
+        self._started = (time.perf_counter(), time.process_time())
+        if self.cprofile_path:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop(self):
+        if not self.enabled or self._started is None:
+            return
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(self.cprofile_path)
+        wall, cpu = self._started
+        self.total = {
+            'wall_seconds': time.perf_counter() - wall,
+            'cpu_seconds': time.process_time() - cpu,
+        }
+
+    def _enter(self, name):
+        now = (time.perf_counter(), time.process_time())
+        if self._stack:
+            self._charge(self._stack[-1], now)
+        self._stack.append([name, now])
+
+    def _exit(self):
+        now = (time.perf_counter(), time.process_time())
+        self._charge(self._stack.pop(), now)
+        if self._stack:
+            # The enclosing stage resumes from here.
+            self._stack[-1][1] = now
+
+    def _charge(self, entry, now):
+        name, (wall, cpu) = entry
+        stage = self.stages.setdefault(name, {'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'calls': 0})
+        stage['wall_seconds'] += now[0] - wall
+        stage['cpu_seconds'] += now[1] - cpu
+        entry[1] = now
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+        self._enter(name)
+        try:
+            yield
+        finally:
+            self._exit()
+            self.stages[name]['calls'] += 1
+
+    def timed(self, name, iterable, count=None):
+        """Wrap ``iterable`` so the time spent producing each item is charged to ``name``."""
+        if not self.enabled:
+            return iterable
+        return self._timed(name, iter(iterable), count)
+
+    def _timed(self, name, iterator, count):
+        while True:
+            self._enter(name)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self._exit()
+            self.stages[name]['calls'] += 1
+            if count:
+                self.counts[count] = self.counts.get(count, 0) + 1
+            yield item
+
+    def add_counts(self, **counts):
+        if not self.enabled:
+            return
+        for name, value in counts.items():
+            self.counts[name] = self.counts.get(name, 0) + value
+
+    def add_summary(self, summary):
+        """Record the write counts from an ``ingest`` summary."""
+        self.add_counts(**{key: summary[key] for key in ('created', 'updated', 'deleted', 'unchanged', 'duplicates')})
+
+    def merge(self, report):
+        """Fold a worker process's report into this one."""
+        for name, stage in report['stages'].items():
+            totals = self.stages.setdefault(name, {'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'calls': 0})
+            for key, value in stage.items():
+                totals[key] += value
+        self.add_counts(**report['counts'])
+
+    def report(self):
+        return {
+            'stages': self.stages,
+            'counts': self.counts,
+            'total': self.total,
+            'cprofile': self.cprofile_path,
+        }
+
+    def write(self, path):
+        """Write the JSON report to ``path``, or to stdout for ``-``."""
+        report = json.dumps(self.report(), indent=2)
+        if path == '-':
+            sys.stdout.write(report + '\n')
+        else:
+            with open(path, 'w') as file:
+                file.write(report + '\n')
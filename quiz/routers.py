@@ -0,0 +1,33 @@
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from . import bank_db
+from .models import Question
+
+
+class QuestionBankRouter:
+    """
+    Reads questions from the read-only bank copy (``quiz.bank_db``) once it
+    is enabled and published. Writes, and reads made inside a transaction
+    on the default database, stay on the default database so importers see
+    their own changes.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model is Question and not connections[DEFAULT_DB_ALIAS].in_atomic_block and bank_db.is_available():
+            return bank_db.BANK_DB
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Answers reference questions by id in both databases.
+        if isinstance(obj1, Question) or isinstance(obj2, Question):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == bank_db.BANK_DB:
+            # Built by bank_db.publish, never migrated.
+            return False
+        return None
@@ -0,0 +1,16 @@
+"""
+SQLite tuning for many candidates saving answers at once.
+
+``SQLITE_PRAGMAS`` is applied to every new SQLite connection as soon as it
+is opened. The settings module explains the defaults; set it to ``{}`` to
+run on SQLite's own.
+"""
+from django.conf import settings
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,201 @@
+"""
+Working state of the candidate's open quiz.
+
+With ``QUIZ_STATE_IN_SESSION`` the question order, deadline and saved
+answers are kept in the Django session next to ``quiz_session_id``, so the
+question pages never read ``QuizSession`` or ``Answer``. Paired with a cache
+or signed-cookie ``SESSION_ENGINE`` they need no database queries at all.
+
+The database stays authoritative: answers are written through whenever
+quiz.js flushes a batch, and the session is closed in the database on
+submit. A missing or stale state is rebuilt from the database.
+
+The ``a``-prefixed functions are the same operations for async views.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from datetime import datetime, timezone
+from .models import Answer, QuizSession
+
+
+SESSION_KEY = 'quiz_state'
+
+
+class QuizState:
+    """
+    The parts of an open ``QuizSession`` the question pages read, behind
+    the same methods, so views can be handed either.
+    """
+    is_completed = False
+
+    def __init__(self, quiz_session_id, question_ids, deadline, answers):
+        self.id = quiz_session_id
+        self.question_ids = question_ids
+        self.deadline = deadline
+        # Question id (as a string, like the session's JSON) -> [option, seq].
+        self.answers = answers
+
+    @classmethod
+    def from_quiz_session(cls, quiz_session):
+        answers = {
+            str(question_id): [option, seq]
+            for question_id, option, seq in quiz_session.answers.values_list('question_id', 'option', 'seq')
+        }
+        return cls(quiz_session.id, quiz_session.get_selected_questions(), quiz_session.deadline, answers)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['id'], data['questions'], datetime.fromtimestamp(data['deadline'], timezone.utc), data['answers'])
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'questions': self.question_ids,
+            'deadline': self.deadline.timestamp(),
+            'answers': self.answers,
+        }
+
+    def get_selected_questions(self):
+        return self.question_ids
+
+    def get_user_answer(self, question_id):
+        answer = self.answers.get(str(question_id))
+        return answer[0] if answer else ''
+
+    def get_user_answers(self):
+        return {question_id: option for question_id, (option, _) in self.answers.items()}
+
+    def apply(self, changes):
+        """Mirror what ``Answer.record_changes`` wrote for ``changes``."""
+        selected_questions = set(self.question_ids)
+        for question_id, change in Answer.latest_changes(changes).items():
+            if question_id not in selected_questions:
+                continue
+            key = str(question_id)
+            current = self.answers.get(key)
+            # Strictly newer, as there: a resent change is not applied again.
+            if current is None or change['seq'] > current[1]:
+                self.answers[key] = [change['answer'], change['seq']]
+
+    def complete(self):
+        quiz_session = get_object_or_404(QuizSession, id=self.id)
+        if not quiz_session.is_completed:
+            quiz_session.complete()
+        self.is_completed = True
+
+
+def begin(request, quiz_session):
+    request.session['quiz_session_id'] = quiz_session.id
+    if settings.QUIZ_STATE_IN_SESSION:
+        save(request, QuizState(quiz_session.id, quiz_session.get_selected_questions(), quiz_session.deadline, {}))
+
+
+def get_quiz_session(request):
+    """
+    The candidate's quiz: a ``QuizState`` when it is kept in the session,
+    otherwise the ``QuizSession``. Returns None without a quiz and raises
+    Http404 for an unknown one.
+    """
+    quiz_session_id = request.session.get('quiz_session_id')
+    if not quiz_session_id:
+        return None
+
+    if settings.QUIZ_STATE_IN_SESSION:
+        data = request.session.get(SESSION_KEY)
+        if data and data['id'] == quiz_session_id:
+            return QuizState.from_dict(data)
+
+    quiz_session = get_object_or_404(QuizSession, id=quiz_session_id)
+    if settings.QUIZ_STATE_IN_SESSION and not quiz_session.is_completed:
+        # Started before the setting was turned on, or evicted from the cache.
+        save(request, QuizState.from_quiz_session(quiz_session))
+    return quiz_session
+
+
+def record_changes(request, quiz_session_id, changes):
+    """``Answer.record_changes``, keeping the session's copy of the answers in step."""
+    try:
+        saved = Answer.record_changes(quiz_session_id, changes)
+    except QuizSession.DoesNotExist:
+        # Closed elsewhere, e.g. by expire_sessions; reload it from the database.
+        forget(request)
+        raise
+
+    data = request.session.get(SESSION_KEY) if settings.QUIZ_STATE_IN_SESSION else None
+    if data and data['id'] == quiz_session_id:
+        state = QuizState.from_dict(data)
+        state.apply(changes)
+        save(request, state)
+    return saved
+
+
+def record_answer(request, quiz_session_id, question_id, option):
+    return record_changes(request, quiz_session_id, [Answer.change(question_id, option)])
+
+
+def complete(request, quiz_session):
+    if not quiz_session.is_completed:
+        quiz_session.complete()
+    forget(request)
+
+
+def save(request, state):
+    request.session[SESSION_KEY] = state.to_dict()
+
+
+def forget(request):
+    request.session.pop(SESSION_KEY, None)
+
+
+async def aget_quiz_session(request):
+    quiz_session_id = await request.session.aget('quiz_session_id')
+    if not quiz_session_id:
+        return None
+
+    if settings.QUIZ_STATE_IN_SESSION:
+        data = await request.session.aget(SESSION_KEY)
+        if data and data['id'] == quiz_session_id:
+            return QuizState.from_dict(data)
+
+    try:
+        quiz_session = await QuizSession.objects.aget(id=quiz_session_id)
+    except QuizSession.DoesNotExist:
+        raise Http404('No QuizSession matches the given query.')
+    if settings.QUIZ_STATE_IN_SESSION and not quiz_session.is_completed:
+        await asave(request, await sync_to_async(QuizState.from_quiz_session)(quiz_session))
+    return quiz_session
+
+
+async def arecord_changes(request, quiz_session_id, changes):
+    try:
+        saved = await sync_to_async(Answer.record_changes)(quiz_session_id, changes)
+    except QuizSession.DoesNotExist:
+        await aforget(request)
+        raise
+
+    data = await request.session.aget(SESSION_KEY) if settings.QUIZ_STATE_IN_SESSION else None
+    if data and data['id'] == quiz_session_id:
+        state = QuizState.from_dict(data)
+        state.apply(changes)
+        await asave(request, state)
+    return saved
+
+
+async def arecord_answer(request, quiz_session_id, question_id, option):
+    return await arecord_changes(request, quiz_session_id, [Answer.change(question_id, option)])
+
+
+async def acomplete(request, quiz_session):
+    if not quiz_session.is_completed:
+        await sync_to_async(quiz_session.complete)()
+    await aforget(request)
+
+
+async def asave(request, state):
+    await request.session.aset(SESSION_KEY, state.to_dict())
+
+
+async def aforget(request):
+    await request.session.apop(SESSION_KEY, None)
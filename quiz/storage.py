@@ -0,0 +1,91 @@
+"""
+Static files build step, run by ``collectstatic``.
+
+On top of ``ManifestStaticFilesStorage``'s content-hashed copies, CSS is
+minified and every compressible file gets a gzip copy and, when the
+``brotli`` package is installed, a brotli one, for
+``quiz.middleware.PrecompressedStaticMiddleware`` to serve. The hashed
+names are derived from the unminified source, which is just as good for
+cache busting since minifying is deterministic.
+
+JavaScript is only compressed: minifying it safely takes a real tokenizer
+(template literals, regular expressions), and compression already gets
+most of the saving.
+"""
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+import gzip
+import re
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE = ('.css', '.js', '.html', '.svg', '.json', '.txt', '.xml', '.map', '.ico')
+# Smaller files fit in a packet either way.
+MIN_COMPRESS_BYTES = 256
+
+CSS_TOKEN = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|/\*.*?\*/)', re.DOTALL)
+CSS_PUNCTUATION = re.compile(r'\s*([{};,>])\s*|:\s+')
+
+
+def minify_css(source):
+    """Drop comments and collapse whitespace, leaving strings alone."""
+    parts = []
+    for piece in CSS_TOKEN.split(source):
+        if piece.startswith('/*'):
+            continue
+        if piece[:1] in ('"', "'"):
+            parts.append(piece)
+            continue
+        piece = re.sub(r'\s+', ' ', piece)
+        piece = CSS_PUNCTUATION.sub(lambda match: match.group(1) or ':', piece)
+        parts.append(piece.replace(';}', '}'))
+    return ''.join(parts).strip()
+
+
+MINIFIERS = {'.css': minify_css}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+
+        for name in sorted(set(paths) | set(self.hashed_files.values())):
+            if not self.exists(name):
+                continue
+            self.minify(name)
+            self.compress(name)
+
+    def minify(self, name):
+        minifier = MINIFIERS.get(name[name.rfind('.'):])
+        # Third-party files such as the admin's usually ship minified already.
+        if minifier is None or '.min.' in name or name.startswith('admin/'):
+            return
+        with self.open(name) as file:
+            source = file.read().decode('utf-8')
+        self.delete(name)
+        self._save(name, ContentFile(minifier(source).encode('utf-8')))
+
+    def compress(self, name):
+        if not name.endswith(COMPRESSIBLE):
+            return
+        with self.open(name) as file:
+            content = file.read()
+        if len(content) < MIN_COMPRESS_BYTES:
+            return
+
+        variants = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants['.br'] = brotli.compress(content)
+        for suffix, compressed in variants.items():
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            # Not worth a second copy unless it's noticeably smaller.
+            if len(compressed) < len(content) * 0.95:
+                self._save(name + suffix, ContentFile(compressed))
@@ -0,0 +1,125 @@
+"""
+Synthetic question-bank PDFs for benchmarking the importers.
+
+Writes plain single-font PDFs by hand (no extra dependencies) in either of
+the layouts ``quiz.parsing`` understands:
+
+* ``heading``: ``Question N: ...`` followed by ``A. ...`` options.
+* ``separator``: ``***`` between questions, ``A: ...`` options and an
+  ``ECO Domain Task`` trailer.
+
+Text is generated from a fixed vocabulary with a seeded RNG, so the same
+arguments always produce byte-identical files.
+"""
+import random
+import textwrap
+
+
+LAYOUTS = ('heading', 'separator')
+
+WORDS = (
+    'project manager team stakeholder sponsor risk schedule budget scope iteration backlog '
+    'vendor contract quality review plan change request issue conflict meeting status report '
+    'deliverable milestone resource estimate velocity retrospective increment customer '
+    'requirement approach process agile hybrid predictive communication engagement'
+).split()
+
+LINE_WIDTH = 90
+LINES_PER_PAGE = 60
+PAGE_HEIGHT = 842
+TOP_MARGIN = 800
+LEADING = 12
+
+
+def sentence(rng, words):
+    text = ' '.join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + '.'
+
+
+def question_lines(rng, number, layout):
+    text = ' '.join(sentence(rng, rng.randint(10, 18)) for _ in range(rng.randint(2, 4)))
+    options = [sentence(rng, rng.randint(5, 14)) for _ in range(4)]
+    correct = rng.choice('ABCD')
+    explanation = ' '.join(sentence(rng, rng.randint(10, 18)) for _ in range(rng.randint(1, 3)))
+
+    lines = []
+    if layout == 'separator':
+        lines.append('************')
+        lines.extend(textwrap.wrap(f'Question {number} : {text}', LINE_WIDTH))
+        marker = ':'
+    else:
+        lines.extend(textwrap.wrap(f'Question {number}: {text}', LINE_WIDTH))
+        marker = '.'
+    lines.append('')
+    for letter, option in zip('ABCD', options):
+        lines.extend(textwrap.wrap(f'{letter}{marker} {option}', LINE_WIDTH))
+    lines.append('')
+    lines.append(f'Correct Answer: {correct}')
+    lines.extend(textwrap.wrap(f'Explanation: {explanation}', LINE_WIDTH))
+    if layout == 'separator':
+        lines.append(f'ECO Domain Task: {rng.choice("I II III")}.{rng.randint(1, 14)}')
+    lines.append('')
+    return lines
+
+
+def escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def page_stream(lines, page_number):
+    parts = [f'BT /F1 10 Tf {LEADING} TL 50 {TOP_MARGIN} Td']
+    for line in lines:
+        parts.append(f'({escape(line)}) Tj T*')
+    # Running footer, as in the real banks; the parser drops it as noise.
+    parts.append(f'T* (Page {page_number}) Tj ET')
+    return '\n'.join(parts).encode('latin-1')
+
+
+def write_question_bank(path, questions, layout='separator', seed=0):
+    """
+    Write a PDF with ``questions`` questions to ``path`` and return the
+    number of pages.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f'Unknown layout {layout!r}; expected one of {LAYOUTS}')
+
+    rng = random.Random(seed)
+    pages = [[]]
+    for number in range(1, questions + 1):
+        for line in question_lines(rng, number, layout):
+            if len(pages[-1]) >= LINES_PER_PAGE:
+                pages.append([])
+            pages[-1].append(line)
+
+    # Object 1: catalog, 2: page tree, 3: font, then a page and its
+    # content stream for every page.
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        None,
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+    ]
+    kids = []
+    for page_number, lines in enumerate(pages, start=1):
+        stream = page_stream(lines, page_number)
+        content_id = len(objects) + 2
+        kids.append(f'{len(objects) + 1} 0 R')
+        objects.append(
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 {PAGE_HEIGHT}] '
+            f'/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>'.encode('latin-1')
+        )
+        objects.append(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+    objects[1] = f'<< /Type /Pages /Kids [{" ".join(kids)}] /Count {len(kids)} >>'.encode('latin-1')
+
+    with open(path, 'wb') as file:
+        file.write(b'%PDF-1.4\n')
+        offsets = []
+        for object_id, body in enumerate(objects, start=1):
+            offsets.append(file.tell())
+            file.write(b'%d 0 obj\n' % object_id + body + b'\nendobj\n')
+        xref_offset = file.tell()
+        file.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+        for offset in offsets:
+            file.write(b'%010d 00000 n \n' % offset)
+        file.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref_offset))
+
+    return len(pages)
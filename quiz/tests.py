@@ -0,0 +1,276 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from django.utils.http import http_date
+
+from quiz import bank
+from quiz.ingest import open_checkpoint, replace_questions, write_batches
+from quiz.models import Answer, ImportCheckpoint, Question, QuizSession
+from quiz.parsing import QuestionParser, parse_page_batches
+from quiz.state import QuizState
+from quiz.views import render_conditional
+
+
+def question_data(number, source='bank', correct_option='A'):
+    return {
+        'source': source,
+        'question_number': number,
+        'question_text': f'Question text {number}?',
+        'option_a': 'First',
+        'option_b': 'Second',
+        'option_c': 'Third',
+        'option_d': 'Fourth',
+        'correct_option': correct_option,
+        'explanation': f'Explanation {number}.',
+    }
+
+
+def reset_bank():
+    # Each test rolls the bank version back, so don't trust an earlier snapshot.
+    bank._snapshot = None
+    bank._checked_at = 0.0
+
+
+class AnswerTests(TestCase):
+
+    def setUp(self):
+        reset_bank()
+        self.questions = [Question.objects.create(**question_data(number)) for number in range(1, 6)]
+        self.question_ids = [question.id for question in self.questions]
+        bank.bank_changed()
+        self.quiz_session = QuizSession(deadline=timezone.now() + timedelta(hours=1))
+        self.quiz_session.set_selected_questions(self.question_ids)
+        self.quiz_session.save()
+
+    def record(self, *changes):
+        return Answer.record_changes(self.quiz_session.id, [
+            {'question_id': question_id, 'answer': option, 'seq': seq} for question_id, option, seq in changes
+        ])
+
+    def stored(self, question_id):
+        return Answer.objects.filter(session=self.quiz_session, question_id=question_id).values_list(
+            'option', 'seq',
+        ).first()
+
+    def score(self):
+        self.quiz_session.refresh_from_db()
+        return self.quiz_session.score
+
+    def test_score_follows_changed_answers(self):
+        first, second = self.question_ids[:2]
+        self.record((first, 'A', 1), (second, 'A', 2))
+        self.assertEqual(self.score(), 2)
+
+        self.record((first, 'B', 3))
+        self.assertEqual(self.score(), 1)
+
+        self.record((first, 'A', 4))
+        self.assertEqual(self.score(), 2)
+        self.assertEqual(self.score(), self.quiz_session.calculate_score())
+
+    def test_older_change_is_ignored(self):
+        question_id = self.question_ids[0]
+        self.record((question_id, 'A', 10))
+
+        self.assertEqual(self.record((question_id, 'B', 5)), 0)
+        self.assertEqual(self.stored(question_id), ('A', 10))
+        self.assertEqual(self.score(), 1)
+
+    def test_resent_change_is_ignored(self):
+        question_id = self.question_ids[0]
+        self.record((question_id, 'A', 10))
+
+        self.assertEqual(self.record((question_id, 'B', 10)), 0)
+        self.assertEqual(self.stored(question_id), ('A', 10))
+        self.assertEqual(self.score(), 1)
+
+    def test_last_change_in_a_batch_wins(self):
+        question_id = self.question_ids[0]
+        self.assertEqual(self.record((question_id, 'A', 5), (question_id, 'C', 5)), 1)
+        self.assertEqual(self.stored(question_id), ('C', 5))
+        self.assertEqual(self.score(), 0)
+
+    def test_changes_outside_the_session_are_dropped(self):
+        other = Question.objects.create(**question_data(99))
+        bank.bank_changed()
+
+        self.assertEqual(self.record((other.id, 'A', 1)), 0)
+        self.assertEqual(self.score(), 0)
+
+    def test_session_state_matches_the_database(self):
+        first, second = self.question_ids[:2]
+        batches = [
+            [(first, 'A', 10)],
+            # Resent with the same seq, then an older change.
+            [(first, 'B', 10), (second, 'D', 3)],
+            [(second, 'C', 2)],
+            [(first, 'C', 11), (first, 'D', 11)],
+        ]
+        quiz_state = QuizState(self.quiz_session.id, self.question_ids, self.quiz_session.deadline, {})
+        for batch in batches:
+            changes = [{'question_id': question_id, 'answer': option, 'seq': seq} for question_id, option, seq in batch]
+            Answer.record_changes(self.quiz_session.id, changes)
+            quiz_state.apply(changes)
+            self.assertEqual(quiz_state.get_user_answers(), self.quiz_session.get_user_answers())
+
+        self.assertEqual(quiz_state.get_user_answers(), {str(first): 'D', str(second): 'D'})
+
+    def test_complete_grades_and_closes(self):
+        first, second = self.question_ids[:2]
+        self.record((first, 'A', 1), (second, 'B', 2))
+
+        self.quiz_session.complete()
+        self.quiz_session.refresh_from_db()
+        self.assertTrue(self.quiz_session.is_completed)
+        self.assertEqual(self.quiz_session.get_answer_slots(), ['A', 'B', '', '', ''])
+        self.assertEqual(self.quiz_session.get_correct_slots(), [True, False, False, False, False])
+        self.assertEqual(self.quiz_session.score, 1)
+
+        with self.assertRaises(QuizSession.DoesNotExist):
+            self.record((second, 'A', 3))
+        self.assertEqual(self.score(), 1)
+
+    def test_replacing_questions_lowers_open_scores(self):
+        first, second = self.question_ids[:2]
+        self.record((first, 'A', 1), (second, 'A', 2))
+
+        # The new bank no longer has question 1.
+        summary = replace_questions([question_data(number) for number in range(2, 6)], sources=['bank'])
+
+        self.assertEqual(summary['deleted'], 5)
+        self.assertEqual(self.score(), 0)
+        self.assertEqual(self.score(), self.quiz_session.calculate_score())
+
+
+def bank_pages(questions, per_page):
+    """``(page_number, text)`` pairs with ``per_page`` numbered questions on each page."""
+    pages = []
+    for first in range(1, questions + 1, per_page):
+        lines = []
+        for number in range(first, min(first + per_page, questions + 1)):
+            lines += [
+                f'Question {number}: What is question {number}?',
+                'A. First', 'B. Second', 'C. Third', 'D. Fourth',
+                'Answer: B',
+            ]
+        pages.append((len(pages) + 1, '\n'.join(lines)))
+    return pages
+
+
+def interrupted(batches, after):
+    for index, batch in enumerate(batches):
+        if index == after:
+            raise RuntimeError('Interrupted')
+        yield batch
+
+
+class CheckpointTests(TestCase):
+
+    def setUp(self):
+        reset_bank()
+        self.pages = bank_pages(questions=12, per_page=2)
+
+    def import_range(self, checkpoint, batch_pages=2, after=None):
+        parser = QuestionParser(source='bank', first_page=checkpoint.next_page, last_page=checkpoint.last_page)
+        # Like load_questions, read from the page before the checkpoint.
+        pages = [(number, text) for number, text in self.pages if number >= checkpoint.next_page - 1]
+        batches = parse_page_batches(pages, parser, batch_pages)
+        if after is not None:
+            batches = interrupted(batches, after)
+        return write_batches(batches, checkpoint)
+
+    def test_resume_continues_from_the_last_checkpoint(self):
+        checkpoint = open_checkpoint('bank', 'digest', 1, 6)
+        with self.assertRaises(RuntimeError):
+            self.import_range(checkpoint, after=1)
+
+        checkpoint = open_checkpoint('bank', 'digest', 1, 6, resume=True)
+        self.assertFalse(checkpoint.is_completed)
+        self.assertEqual(checkpoint.next_page, 3)
+        self.assertEqual(checkpoint.questions_written, 4)
+        self.assertEqual(Question.objects.count(), 4)
+
+        summary = self.import_range(checkpoint)
+        checkpoint.refresh_from_db()
+        self.assertTrue(checkpoint.is_completed)
+        self.assertEqual(checkpoint.questions_written, 12)
+        self.assertEqual(summary['created'], 8)
+        self.assertEqual(
+            list(Question.objects.order_by('question_number').values_list('question_number', flat=True)),
+            list(range(1, 13)),
+        )
+
+    def test_without_resume_the_range_starts_over(self):
+        checkpoint = open_checkpoint('bank', 'digest', 1, 6)
+        with self.assertRaises(RuntimeError):
+            self.import_range(checkpoint, after=1)
+
+        checkpoint = open_checkpoint('bank', 'digest', 1, 6)
+        self.assertEqual(checkpoint.next_page, 1)
+        self.assertEqual(checkpoint.questions_written, 0)
+
+        summary = self.import_range(checkpoint)
+        self.assertEqual((summary['created'], summary['unchanged']), (8, 4))
+        self.assertEqual(ImportCheckpoint.objects.get().questions_written, 12)
+
+    def test_unnumbered_questions_are_rejected_in_a_page_range(self):
+        self.pages[2] = (3, '***\nWhat has no number?\nA. First\nB. Second\nC. Third\nD. Fourth\nAnswer: B')
+        parser = QuestionParser(source='bank', first_page=3, last_page=6)
+        questions = [question for batch, _ in parse_page_batches(self.pages[1:], parser, 2) for question in batch]
+
+        self.assertEqual([question['question_number'] for question in questions], list(range(7, 13)))
+        self.assertEqual(parser.rejected, 1)
+
+
+@override_settings(STORAGES={
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    # No collectstatic manifest in tests.
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+class RenderConditionalTests(TestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.rendered = 0
+
+    def get_context(self):
+        self.rendered += 1
+        return {'total_questions': 50, 'duration': '1 hour', 'passing_score': 25}
+
+    def get(self, etag, last_modified=None, **headers):
+        request = self.factory.get('/', headers=headers)
+        return render_conditional(request, 'quiz/start.html', self.get_context, etag, last_modified)
+
+    def test_renders_with_validators(self):
+        last_modified = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+        response = self.get('page', last_modified)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.rendered, 1)
+        self.assertTrue(response.headers['ETag'].startswith('"page-'))
+        self.assertEqual(response.headers['Last-Modified'], http_date(last_modified.timestamp()))
+        self.assertIn('private', response.headers['Cache-Control'])
+        self.assertIn('no-cache', response.headers['Cache-Control'])
+
+    def test_current_copy_is_not_rendered_again(self):
+        etag = self.get('page').headers['ETag']
+
+        response = self.get('page', if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertEqual(self.rendered, 1)
+
+    def test_changed_data_is_rendered(self):
+        etag = self.get('page').headers['ETag']
+
+        response = self.get('changed', if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.rendered, 2)
+
+    def test_unmodified_since_last_visit(self):
+        last_modified = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+
+        response = self.get('page', last_modified, if_modified_since=http_date(last_modified.timestamp() + 60))
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.rendered, 0)
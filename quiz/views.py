@@ -1,73 +1,164 @@
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse
+from django.db import IntegrityError
+from django.http import Http404, JsonResponse
+from django.template.loader import get_template
 from django.utils import timezone
-from .models import Question, QuizSession
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from .bank import assemble_exam, get_bank
+from .models import QuizSession
+from . import state
+from datetime import timedelta
+from functools import lru_cache
+import hashlib
 import json
 
 
 def start_quiz(request):
-    return render(request, 'quiz/start.html')
+    context = start_context()
+    # The page only changes with its template, the exam settings and the
+    # CSRF token in its form.
+    csrf_cookie = request.COOKIES.get(settings.CSRF_COOKIE_NAME)
+    if not csrf_cookie or settings.CSRF_USE_SESSIONS:
+        return render(request, 'quiz/start.html', context)
+    etag = hashlib.sha256(f"{csrf_cookie}-{context['total_questions']}-{settings.QUIZ_DURATION}".encode())
+    return render_conditional(request, 'quiz/start.html', lambda: context, etag.hexdigest()[:16])
 
 
-def begin_quiz(request):
-    all_questions = list(Question.objects.all().order_by('question_number').values_list('id', flat=True))
+def start_context():
+    minutes = settings.QUIZ_DURATION // 60
+    if minutes % 60 == 0:
+        duration = f"{minutes // 60} hour{'s' if minutes != 60 else ''}"
+    else:
+        duration = f"{minutes} minute{'s' if minutes != 1 else ''}"
+    return {
+        'total_questions': settings.QUIZ_LENGTH,
+        'duration': duration,
+        'passing_score': (settings.QUIZ_LENGTH + 1) // 2,
+    }
 
-    if len(all_questions) < 50:
-        return JsonResponse({'error': 'Not enough questions in database'}, status=400)
 
-    selected_questions = all_questions[:50]
+def begin_quiz(request):
+    try:
+        selected_questions, seed = assemble_exam()
+    except ValueError:
+        return JsonResponse({'error': 'Not enough questions in database'}, status=400)
 
-    quiz_session = QuizSession.objects.create()
+    quiz_session = QuizSession(seed=seed, deadline=timezone.now() + timedelta(seconds=settings.QUIZ_DURATION))
     quiz_session.set_selected_questions(selected_questions)
     quiz_session.save()
 
-    request.session['quiz_session_id'] = quiz_session.id
+    state.begin(request, quiz_session)
 
     return redirect('quiz_question', question_index=0)
 
 
 def quiz_question(request, question_index):
-    quiz_session_id = request.session.get('quiz_session_id')
+    quiz_session = state.get_quiz_session(request)
     
-    if not quiz_session_id:
-        return redirect('start_quiz')
+    response = question_redirect(quiz_session, question_index)
+    if response is not None:
+        return response
     
-    quiz_session = get_object_or_404(QuizSession, id=quiz_session_id)
+    time_remaining = seconds_remaining(quiz_session)
     
-    if quiz_session.is_completed:
+    if time_remaining <= 0:
+        state.complete(request, quiz_session)
         return redirect('quiz_results')
     
-    selected_questions = quiz_session.get_selected_questions()
+    question_id = quiz_session.get_selected_questions()[question_index]
+    context = question_context(
+        quiz_session, question_index, get_bank(), quiz_session.get_user_answer(question_id), time_remaining,
+    )
     
-    if question_index < 0 or question_index >= len(selected_questions):
-        return redirect('quiz_question', question_index=0)
-    
-    question_id = selected_questions[question_index]
-    question = get_object_or_404(Question, id=question_id)
+    return render(request, 'quiz/question.html', context)
+
+
+def exam_data(request):
+    """The whole exam in one payload, for quiz.js to navigate without page loads."""
+    quiz_session = state.get_quiz_session(request)
     
-    user_answers = quiz_session.get_user_answers()
-    selected_answer = user_answers.get(str(question.id), '')
+    response = exam_error(quiz_session)
+    if response is not None:
+        return response
     
-    time_elapsed = (timezone.now() - quiz_session.start_time).total_seconds()
-    time_remaining = max(0, 3600 - time_elapsed)
+    return JsonResponse(exam_payload(quiz_session, get_bank(), quiz_session.get_user_answers()))
+
+
+# Shared with quiz.async_views, which only differ in how they query.
+
+def question_redirect(quiz_session, question_index):
+    """Where to send the candidate instead of question ``question_index``, if anywhere."""
+    if quiz_session is None:
+        return redirect('start_quiz')
     
-    if time_remaining <= 0:
-        quiz_session.end_time = timezone.now()
-        quiz_session.is_completed = True
-        quiz_session.calculate_score()
-        quiz_session.save()
+    if quiz_session.is_completed:
         return redirect('quiz_results')
     
-    context = {
+    if question_index < 0 or question_index >= len(quiz_session.get_selected_questions()):
+        return redirect('quiz_question', question_index=0)
+    
+    return None
+
+
+def seconds_remaining(quiz_session):
+    return max(0, (quiz_session.deadline - timezone.now()).total_seconds())
+
+
+def question_context(quiz_session, question_index, bank, selected_answer, time_remaining):
+    selected_questions = quiz_session.get_selected_questions()
+    question = bank.get(selected_questions[question_index])
+    if question is None:
+        raise Http404('Question no longer exists')
+    
+    return {
         'question': question,
         'question_index': question_index,
         'total_questions': len(selected_questions),
         'selected_answer': selected_answer,
+        'bank_version': bank.version,
         'time_remaining': int(time_remaining),
         'quiz_session_id': quiz_session.id,
+        'client_navigation': settings.QUIZ_CLIENT_NAVIGATION,
     }
+
+
+def exam_error(quiz_session):
+    if quiz_session is None:
+        return JsonResponse({'error': 'No active quiz session'}, status=400)
     
-    return render(request, 'quiz/question.html', context)
+    if quiz_session.is_completed:
+        return JsonResponse({'error': 'Quiz already submitted'}, status=400)
+    
+    return None
+
+
+def exam_payload(quiz_session, bank, answers):
+    questions = []
+    for question_id in quiz_session.get_selected_questions():
+        question = bank.get(question_id)
+        # Positions must line up with /question/<index>/, so keep a gap
+        # for a question that has since been removed.
+        questions.append(question and {
+            'id': question.id,
+            'number': question.question_number,
+            'text': question.question_text,
+            'options': {
+                'A': question.option_a,
+                'B': question.option_b,
+                'C': question.option_c,
+                'D': question.option_d,
+            },
+        })
+    
+    return {
+        'questions': questions,
+        'answers': answers,
+        'deadline': quiz_session.deadline.isoformat(),
+        'time_remaining': int(seconds_remaining(quiz_session)),
+    }
 
 
 def save_answer(request):
@@ -77,15 +168,18 @@ def save_answer(request):
         if not quiz_session_id:
             return JsonResponse({'error': 'No active quiz session'}, status=400)
         
-        quiz_session = get_object_or_404(QuizSession, id=quiz_session_id)
-        
         data = json.loads(request.body)
         question_id = data.get('question_id')
         answer = data.get('answer')
         
-        if question_id and answer:
-            quiz_session.set_user_answer(question_id, answer)
-            quiz_session.save()
+        if question_id and answer in ('A', 'B', 'C', 'D'):
+            try:
+                state.record_answer(request, quiz_session_id, question_id, answer)
+            except QuizSession.DoesNotExist:
+                return JsonResponse({'error': 'No active quiz session'}, status=400)
+            except (IntegrityError, TypeError, ValueError):
+                # Unknown question id.
+                return JsonResponse({'error': 'Invalid data'}, status=400)
             return JsonResponse({'status': 'success'})
         
         return JsonResponse({'error': 'Invalid data'}, status=400)
@@ -93,18 +187,55 @@ def save_answer(request):
     return JsonResponse({'error': 'Invalid request'}, status=400)
 
 
+def save_answers(request):
+    if request.method == 'POST':
+        quiz_session_id = request.session.get('quiz_session_id')
+        
+        if not quiz_session_id:
+            return JsonResponse({'error': 'No active quiz session'}, status=400)
+        
+        changes = read_changes(request)
+        if changes is None:
+            return JsonResponse({'error': 'Invalid data'}, status=400)
+        
+        try:
+            saved = state.record_changes(request, quiz_session_id, changes)
+        except QuizSession.DoesNotExist:
+            return JsonResponse({'error': 'No active quiz session'}, status=400)
+        except IntegrityError:
+            return JsonResponse({'error': 'Invalid data'}, status=400)
+        return JsonResponse({'status': 'success', 'saved': saved})
+    
+    return JsonResponse({'error': 'Invalid request'}, status=400)
+
+
+def read_changes(request):
+    """The ``{question_id, answer, seq}`` changes posted by quiz.js, or None if they are invalid."""
+    # fetch() sends JSON; navigator.sendBeacon() sends a form with the CSRF token.
+    try:
+        if request.content_type == 'application/json':
+            changes = json.loads(request.body).get('changes')
+        else:
+            changes = json.loads(request.POST.get('changes', ''))
+        changes = [
+            {'question_id': int(change['question_id']), 'answer': change['answer'], 'seq': int(change['seq'])}
+            for change in changes
+        ]
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+    
+    if not all(change['answer'] in ('A', 'B', 'C', 'D') for change in changes):
+        return None
+    return changes
+
+
 def submit_quiz(request):
-    quiz_session_id = request.session.get('quiz_session_id')
+    quiz_session = state.get_quiz_session(request)
     
-    if not quiz_session_id:
+    if quiz_session is None:
         return redirect('start_quiz')
     
-    quiz_session = get_object_or_404(QuizSession, id=quiz_session_id)
-    
-    quiz_session.end_time = timezone.now()
-    quiz_session.is_completed = True
-    quiz_session.calculate_score()
-    quiz_session.save()
+    state.complete(request, quiz_session)
     
     return redirect('quiz_results')
 
@@ -120,29 +251,10 @@ def quiz_results(request):
     if not quiz_session.is_completed:
         return redirect('quiz_question', question_index=0)
     
-    selected_questions = quiz_session.get_selected_questions()
-    questions = Question.objects.filter(id__in=selected_questions).order_by('question_number')
-    user_answers = quiz_session.get_user_answers()
-
-    results = []
-    for question in questions:
-        user_answer = user_answers.get(str(question.id), '')
-        is_correct = user_answer == question.correct_option
-        
-        results.append({
-            'question': question,
-            'user_answer': user_answer,
-            'is_correct': is_correct,
-        })
-    
-    context = {
-        'quiz_session': quiz_session,
-        'total_questions': len(selected_questions),
-        'score': quiz_session.score,
-        'percentage': (quiz_session.score / len(selected_questions)) * 100,
-    }
-    
-    return render(request, 'quiz/results.html', context)
+    return render_conditional(
+        request, 'quiz/results.html', lambda: results_context(quiz_session),
+        quiz_session.id, quiz_session.end_time,
+    )
 
 
 def quiz_explanation(request):
@@ -156,25 +268,72 @@ def quiz_explanation(request):
     if not quiz_session.is_completed:
         return redirect('quiz_question', question_index=0)
     
+    bank = get_bank()
+    return render_conditional(
+        request, 'quiz/explanation.html', lambda: explanation_context(quiz_session, bank),
+        f'{quiz_session.id}-{bank.version}', quiz_session.end_time,
+    )
+
+
+def results_context(quiz_session):
     selected_questions = quiz_session.get_selected_questions()
-    questions = Question.objects.filter(id__in=selected_questions).order_by('question_number')
-    user_answers = quiz_session.get_user_answers()
+    return {
+        'quiz_session': quiz_session,
+        'total_questions': len(selected_questions),
+        'score': quiz_session.score,
+        'percentage': (quiz_session.score / len(selected_questions)) * 100,
+    }
 
-    wrong_questions = []
-    for question in questions:
-        user_answer = user_answers.get(str(question.id), '')
-        is_correct = user_answer == question.correct_option
-        
-        if not is_correct:
-            wrong_questions.append({
-                'question': question,
-                'user_answer': user_answer,
-                'correct_answer': question.correct_option,
-            })
-    
-    context = {
-        'wrong_questions': wrong_questions,
+
+def explanation_context(quiz_session, bank):
+    return {
+        'wrong_questions': get_wrong_questions(quiz_session, bank),
         'quiz_session': quiz_session,
     }
-    
-    return render(request, 'quiz/explanation.html', context)
+
+
+def get_wrong_questions(quiz_session, bank):
+    # Graded once at submit; only the wrong questions' text comes from the bank.
+    wrong_answers = {
+        question_id: user_answer
+        for question_id, user_answer, is_correct in quiz_session.get_results()
+        if not is_correct
+    }
+    return [
+        {
+            'question': question,
+            'user_answer': wrong_answers[question.id],
+            'correct_answer': question.correct_option,
+        }
+        for question in bank.questions(wrong_answers)
+    ]
+
+
+def render_conditional(request, template_name, get_context, etag, last_modified=None):
+    """
+    Render ``template_name`` with ``get_context()``, or answer 304 Not
+    Modified without rendering when the browser's copy is current. The
+    ``etag`` must change whenever the page's data does; the template's own
+    source is added to it, so a deploy that changes the markup does too.
+    """
+    etag = quote_etag(f'{etag}-{template_digest(template_name)}')
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = render(request, template_name, get_context())
+    response.headers['ETag'] = etag
+    if timestamp:
+        response.headers['Last-Modified'] = http_date(timestamp)
+    # Browsers may keep the page but must check it is current; it's per candidate.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@lru_cache
+def template_digest(template_name):
+    digest = hashlib.sha256()
+    for name in ('base.html', template_name):
+        digest.update(get_template(name).template.source.encode())
+    # Pages link to content-hashed static files, which change with collectstatic.
+    digest.update(getattr(staticfiles_storage, 'manifest_hash', '').encode())
+    return digest.hexdigest()[:12]
@@ -1,7 +1,15 @@
 import os
 import sys
+import argparse
 import django
 
+arg_parser = argparse.ArgumentParser(description='Recreate the database and load the bundled question bank')
+arg_parser.add_argument('--profile', metavar='PATH',
+                        help="Write per-stage timings and counts of the import as JSON to PATH ('-' for stdout)")
+arg_parser.add_argument('--cprofile', metavar='PATH',
+                        help='With --profile, also dump cProfile stats of the import to PATH')
+args = arg_parser.parse_args()
+
 print("=" * 60)
 print("QUIZ APPLICATION SETUP")
 print("=" * 60)
@@ -41,28 +49,53 @@ if not result:
     cursor.execute('''
         CREATE TABLE quiz_question (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            question_number INTEGER UNIQUE NOT NULL,
+            source VARCHAR(255) NOT NULL DEFAULT '',
+            question_number INTEGER NOT NULL,
             question_text TEXT NOT NULL,
             option_a TEXT NOT NULL,
             option_b TEXT NOT NULL,
             option_c TEXT NOT NULL,
             option_d TEXT NOT NULL,
             correct_option VARCHAR(1) NOT NULL,
-            explanation TEXT NOT NULL
+            explanation TEXT NOT NULL,
+            content_hash VARCHAR(64) NOT NULL DEFAULT '',
+            UNIQUE (source, question_number)
         )
     ''')
     cursor.execute('''
         CREATE TABLE quiz_quizsession (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             start_time DATETIME NOT NULL,
+            deadline DATETIME NOT NULL,
             end_time DATETIME,
-            selected_questions TEXT NOT NULL,
-            user_answers TEXT NOT NULL DEFAULT '{}',
+            question_order BLOB NOT NULL DEFAULT x'',
+            answer_slots BLOB NOT NULL DEFAULT x'',
+            correct_slots BLOB NOT NULL DEFAULT x'',
+            seed BIGINT,
             score INTEGER NOT NULL DEFAULT 0,
             is_completed BOOLEAN NOT NULL DEFAULT 0,
             current_question_index INTEGER NOT NULL DEFAULT 0
         )
     ''')
+    cursor.execute('''
+        CREATE TABLE quiz_answer (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id INTEGER NOT NULL REFERENCES quiz_quizsession (id),
+            question_id INTEGER NOT NULL REFERENCES quiz_question (id),
+            option VARCHAR(1) NOT NULL,
+            seq BIGINT NOT NULL DEFAULT 0,
+            is_correct BOOLEAN NOT NULL DEFAULT 0,
+            answered_at DATETIME NOT NULL,
+            UNIQUE (session_id, question_id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE quiz_questionbankversion (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            version INTEGER NOT NULL DEFAULT 1,
+            updated_at DATETIME NOT NULL
+        )
+    ''')
     connection.commit()
     print("✓ Tables created manually")
 
@@ -70,8 +103,10 @@ if not result:
 print("\n[3/4] Loading questions from PDF...")
 
 from quiz.models import Question
-import PyPDF2
-import re
+from quiz.extraction import count_pages, iter_pages
+from quiz.ingest import replace_questions
+from quiz.parsing import QuestionParser, parse_pages, source_name
+from quiz.profiling import ImportProfile
 
 pdf_path = os.path.join(os.path.dirname(__file__), 'simulator', 'questions.pdf')
 
@@ -80,98 +115,21 @@ if not os.path.exists(pdf_path):
     sys.exit(1)
 
 try:
-    with open(pdf_path, 'rb') as file:
-        pdf_reader = PyPDF2.PdfReader(file)
-        full_text = ""
-        
-        print(f"  Reading {len(pdf_reader.pages)} pages...")
-        for page in pdf_reader.pages:
-            full_text += page.extract_text()
-
-    # Parse questions
-    lines = full_text.split('\n')
-    clean_lines = []
-    
-    for line in lines:
-        line = line.strip()
-        if line and not re.match(r'^\d+$', line) and not re.match(r'^Page\s*\d+', line, re.IGNORECASE):
-            clean_lines.append(line)
-    
-    text = '\n'.join(clean_lines)
-    
-    question_pattern = r'Question\s*(\d+)[:\s]*(.+?)(?=Question\s*\d+|$)'
-    matches = re.finditer(question_pattern, text, re.DOTALL | re.IGNORECASE)
-    
-    questions_data = []
-    
-    for match in matches:
-        q_num = int(match.group(1))
-        q_content = match.group(2).strip()
-        
-        lines = [line.strip() for line in q_content.split('\n') if line.strip()]
-        
-        if len(lines) < 7:
-            continue
-        
-        question_text = lines[0]
-        option_a = ""
-        option_b = ""
-        option_c = ""
-        option_d = ""
-        correct_option = ""
-        explanation = ""
-        
-        i = 1
-        while i < len(lines):
-            line = lines[i]
-            
-            if re.match(r'^[Aa][\.:\)]\s*', line):
-                option_a = re.sub(r'^[Aa][\.:\)]\s*', '', line).strip()
-            elif re.match(r'^[Bb][\.:\)]\s*', line):
-                option_b = re.sub(r'^[Bb][\.:\)]\s*', '', line).strip()
-            elif re.match(r'^[Cc][\.:\)]\s*', line):
-                option_c = re.sub(r'^[Cc][\.:\)]\s*', '', line).strip()
-            elif re.match(r'^[Dd][\.:\)]\s*', line):
-                option_d = re.sub(r'^[Dd][\.:\)]\s*', '', line).strip()
-            elif re.match(r'^(Correct\s*Answer|Answer)[:\s]*([A-Da-d])', line, re.IGNORECASE):
-                match_ans = re.search(r'([A-Da-d])', line)
-                if match_ans:
-                    correct_option = match_ans.group(1).upper()
-            elif re.match(r'^(Explanation|Exp)[:\s]*', line, re.IGNORECASE):
-                explanation = re.sub(r'^(Explanation|Exp)[:\s]*', '', line, flags=re.IGNORECASE).strip()
-                j = i + 1
-                while j < len(lines) and not re.match(r'^Question\s*\d+', lines[j], re.IGNORECASE):
-                    if not re.match(r'^[A-Da-d][\.:\)]\s*', lines[j]) and not re.match(r'^(Correct\s*Answer|Answer)', lines[j], re.IGNORECASE):
-                        explanation += " " + lines[j]
-                    j += 1
-                break
-            
-            i += 1
-        
-        if not all([question_text, option_a, option_b, option_c, option_d, correct_option]):
-            continue
-        
-        if not explanation:
-            explanation = "No explanation provided."
-        
-        questions_data.append({
-            'question_number': q_num,
-            'question_text': question_text,
-            'option_a': option_a,
-            'option_b': option_b,
-            'option_c': option_c,
-            'option_d': option_d,
-            'correct_option': correct_option,
-            'explanation': explanation.strip()
-        })
-    
-    print(f"  Parsed {len(questions_data)} questions from PDF")
+    print(f"  Reading {count_pages(pdf_path)} pages...")
     
-    # Save to database
-    for q_data in questions_data:
-        Question.objects.create(**q_data)
+    # Questions are parsed and saved page by page as the PDF is read
+    profile = ImportProfile(enabled=bool(args.profile), cprofile_path=args.cprofile)
+    profile.start()
+    parser = QuestionParser(source=source_name(pdf_path))
+    with profile.stage('write'):
+        summary = replace_questions(parse_pages(iter_pages(pdf_path), parser, profile))
+    profile.stop()
+    profile.add_summary(summary)
+    if args.profile:
+        profile.write(args.profile)
     
-    print(f"✓ Successfully loaded {len(questions_data)} questions into database")
+    print(f"✓ Successfully loaded {summary['created']} questions into database "
+          f"({summary['rows_per_second']:.0f} rows/second)")
     
 except ImportError:
     print("✗ PyPDF2 is not installed")
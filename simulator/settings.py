@@ -43,6 +43,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Before the session middleware, so static files skip it.
+    'quiz.middleware.PrecompressedStaticMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -78,9 +80,53 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep each worker's connection, and its page cache, between requests.
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Take the write lock when a transaction starts, so concurrent
+            # answer saves wait their turn (busy_timeout) instead of failing
+            # with "database is locked" when a read lock can't be upgraded.
+            # Keep transactions short: imports (quiz.ingest) parse first and
+            # only open theirs for the writes.
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
+# Optional read-only copy of the question bank in its own file (quiz.bank_db).
+# With QUESTION_BANK_SEPARATE, question reads go to it through the router
+# below, while imports keep writing to the default database and publish a new
+# copy after every commit. Run ``manage.py publish_bank`` once to create it.
+
+QUESTION_BANK_SEPARATE = False
+QUESTION_BANK_DATABASE = BASE_DIR / 'bank.sqlite3'
+
+DATABASES['bank'] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    # Immutable: SQLite skips locking and change detection, and memory-maps
+    # it (mmap_size). A new copy is swapped in, never written in place.
+    'NAME': f'file:{QUESTION_BANK_DATABASE}?mode=ro&immutable=1',
+    # Reopened for every request, so a swapped-in copy is picked up.
+    'CONN_MAX_AGE': 0,
+}
+
+DATABASE_ROUTERS = ['quiz.routers.QuestionBankRouter']
+
+# Applied to every new SQLite connection by quiz.sqlite. WAL lets question
+# pages keep reading while answers are written and, with synchronous=NORMAL,
+# only fsyncs at checkpoints instead of on every commit.
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    # Negative sizes are in KiB.
+    'cache_size': -32 * 1024,
+    'temp_store': 'MEMORY',
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -119,6 +165,70 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 
+# ``manage.py collectstatic`` is the build step: it minifies CSS, content-hashes
+# and precompresses everything into STATIC_ROOT (quiz.storage), and
+# quiz.middleware serves it from there. Run it on every deploy; with DEBUG
+# off, templates need its manifest to find the hashed names.
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'quiz.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# Extracted PDF text cache used by the question importers
+
+PDF_TEXT_CACHE_DIR = BASE_DIR / '.cache' / 'pdf_text'
+PDF_TEXT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# How often each worker checks whether its in-memory question bank
+# (quiz.bank) is out of date
+
+QUESTION_BANK_CHECK_SECONDS = 5
+
+# Let quiz.js load the whole exam once and move between questions without
+# page loads
+
+QUIZ_CLIENT_NAVIGATION = False
+
+# Exam assembly (quiz.bank.assemble_exam): questions per exam, and whether
+# each source bank contributes in proportion to its size. QUIZ_DURATION is
+# the time allowed for an exam, in seconds.
+
+QUIZ_LENGTH = 50
+QUIZ_DURATION = 3600
+QUIZ_STRATIFY_BY_SOURCE = True
+
+# Rendered question fragments (templates/quiz/question.html) and, with the
+# cache SESSION_ENGINE, session data. The local-memory cache is per process;
+# use a shared backend such as Memcached or Redis with several workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
+# Keep the open quiz's question order, deadline and answers in the Django
+# session (quiz.state) so question pages don't read the quiz tables; answers
+# are still written through as quiz.js saves them. With a cache or
+# signed-cookie SESSION_ENGINE question pages need no queries at all. A
+# signed cookie holds about 50 questions' state comfortably; use the cache
+# engine with a shared CACHES backend for much longer exams.
+
+QUIZ_STATE_IN_SESSION = False
+SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+
+# Serve the question, answer-saving, submit and results pages with the async
+# views in quiz.async_views; only worthwhile under an ASGI server
+
+QUIZ_ASYNC_VIEWS = False
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -2,8 +2,26 @@ document.addEventListener('DOMContentLoaded', function() {
     const timerDisplay = document.getElementById('timer-display');
     const timerElement = document.getElementById('timer');
     const answerInputs = document.querySelectorAll('input[name="answer"]');
+    const navLinks = document.querySelectorAll('.btn-previous, .btn-next');
+    const previousLink = document.querySelector('.btn-previous');
+    const nextLink = document.querySelector('.btn-next');
+    const submitForm = document.querySelector('form[action="/submit/"]');
+    
+    // In client navigation mode the whole exam is fetched from /exam/ once
+    // and questions are rendered here instead of by a page load each.
+    let exam = null;
+    let currentQuestionId = questionId;
+    let currentIndex = questionIndex;
+    
+    // Answers are buffered and sent to /save-answers/ in batches rather
+    // than one request per click.
+    const SYNC_INTERVAL = 5000;
+    let pendingChanges = [];
+    let savingChanges = null;
+    let lastSeq = 0;
     
     let remainingTime = timeRemaining;
+    let timeUp = false;
     
     function formatTime(seconds) {
         const hours = Math.floor(seconds / 3600);
@@ -15,7 +33,12 @@ document.addEventListener('DOMContentLoaded', function() {
     
     function updateTimer() {
         if (remainingTime <= 0) {
-            window.location.href = '/submit/';
+            if (!timeUp) {
+                timeUp = true;
+                flushAnswers().finally(() => {
+                    window.location.href = '/submit/';
+                });
+            }
             return;
         }
         
@@ -31,33 +54,185 @@ document.addEventListener('DOMContentLoaded', function() {
     updateTimer();
     const timerInterval = setInterval(updateTimer, 1000);
     
+    function nextSeq() {
+        // Timestamps keep sequence numbers increasing across page loads.
+        lastSeq = Math.max(lastSeq + 1, Date.now());
+        return lastSeq;
+    }
+    
+    function queueAnswer(answer) {
+        pendingChanges = pendingChanges.filter(change => change.question_id !== currentQuestionId);
+        pendingChanges.push({
+            question_id: currentQuestionId,
+            answer: answer,
+            seq: nextSeq()
+        });
+    }
+    
+    function flushAnswers() {
+        // One save at a time. Until the one in flight finishes its answers
+        // aren't saved, and if it fails they are pending again, so wait for
+        // it and then flush whatever is left.
+        if (savingChanges) {
+            return savingChanges.then(flushAnswers);
+        }
+        if (pendingChanges.length === 0) {
+            return Promise.resolve();
+        }
+        
+        const changes = pendingChanges;
+        pendingChanges = [];
+        
+        savingChanges = fetch('/save-answers/', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': getCookie('csrftoken')
+            },
+            body: JSON.stringify({ changes: changes }),
+            keepalive: true
+        })
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            return response.json();
+        })
+        .then(data => {
+            console.log(`Saved ${data.saved} answer(s)`);
+        })
+        .catch(error => {
+            console.error('Error saving answers:', error);
+            // Retry on the next flush unless a newer change replaced them.
+            const retry = changes.filter(change =>
+                !pendingChanges.some(pending => pending.question_id === change.question_id));
+            pendingChanges = retry.concat(pendingChanges);
+        })
+        .finally(() => {
+            savingChanges = null;
+        });
+        return savingChanges;
+    }
+    
+    function beaconAnswers() {
+        if (pendingChanges.length === 0 || !navigator.sendBeacon) {
+            return;
+        }
+        
+        const data = new FormData();
+        data.append('csrfmiddlewaretoken', getCookie('csrftoken'));
+        data.append('changes', JSON.stringify(pendingChanges));
+        if (navigator.sendBeacon('/save-answers/', data)) {
+            pendingChanges = [];
+        }
+    }
+    
+    function loadExam() {
+        fetch('/exam/', { headers: { 'Accept': 'application/json' } })
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            return response.json();
+        })
+        .then(data => {
+            exam = data;
+            // Answers changed since this page was rendered win over the payload.
+            pendingChanges.forEach(change => {
+                exam.answers[change.question_id] = change.answer;
+            });
+            remainingTime = Math.min(remainingTime, data.time_remaining);
+            history.replaceState({ index: currentIndex }, '', window.location.href);
+        })
+        .catch(error => {
+            // Fall back to a page load per question.
+            console.error('Error loading exam:', error);
+        });
+    }
+    
+    function updateLink(link, index) {
+        if (!link) {
+            return;
+        }
+        const inRange = index >= 0 && index < exam.questions.length;
+        link.style.visibility = inRange ? '' : 'hidden';
+        link.dataset.questionIndex = index;
+        link.href = inRange ? `/question/${index}/` : '#';
+    }
+    
+    function showQuestion(index) {
+        const question = exam.questions[index];
+        currentIndex = index;
+        currentQuestionId = question.id;
+        
+        document.title = `Question ${index + 1}`;
+        document.querySelector('.question-counter').textContent = `Question ${index + 1} / ${exam.questions.length}`;
+        document.querySelector('.question-number').textContent = `Question ${question.number}`;
+        document.querySelector('.question-text').textContent = question.text;
+        answerInputs.forEach(input => {
+            const label = document.querySelector(`label[for="${input.id}"] .option-text`);
+            label.textContent = question.options[input.value];
+            input.checked = exam.answers[question.id] === input.value;
+        });
+        
+        updateLink(previousLink, index - 1);
+        updateLink(nextLink, index + 1);
+        window.scrollTo(0, 0);
+    }
+    
     answerInputs.forEach(input => {
         input.addEventListener('change', function() {
-            const selectedAnswer = this.value;
-            
-            fetch('/save-answer/', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                    'X-CSRFToken': getCookie('csrftoken')
-                },
-                body: JSON.stringify({
-                    question_id: questionId,
-                    answer: selectedAnswer
-                })
-            })
-            .then(response => response.json())
-            .then(data => {
-                if (data.status === 'success') {
-                    console.log('Answer saved successfully');
-                }
-            })
-            .catch(error => {
-                console.error('Error saving answer:', error);
+            queueAnswer(this.value);
+            if (exam) {
+                exam.answers[currentQuestionId] = this.value;
+            }
+        });
+    });
+    
+    if (clientNavigation) {
+        loadExam();
+        
+        window.addEventListener('popstate', event => {
+            if (exam && event.state && exam.questions[event.state.index]) {
+                showQuestion(event.state.index);
+            }
+        });
+    }
+    
+    setInterval(flushAnswers, SYNC_INTERVAL);
+    
+    // Wait for the flush before leaving, so the next page shows the saved
+    // answer and the score includes it.
+    navLinks.forEach(link => {
+        link.addEventListener('click', function(event) {
+            event.preventDefault();
+            const index = Number(this.dataset.questionIndex);
+            if (exam && exam.questions[index]) {
+                showQuestion(index);
+                history.pushState({ index: index }, '', this.href);
+                return;
+            }
+            flushAnswers().finally(() => {
+                window.location.href = this.href;
             });
         });
     });
     
+    if (submitForm) {
+        submitForm.addEventListener('submit', function(event) {
+            if (event.defaultPrevented) {
+                return;
+            }
+            event.preventDefault();
+            flushAnswers().finally(() => {
+                submitForm.submit();
+            });
+        });
+    }
+    
+    window.addEventListener('beforeunload', beaconAnswers);
+    window.addEventListener('pagehide', beaconAnswers);
+    
     function getCookie(name) {
         let cookieValue = null;
         if (document.cookie && document.cookie !== '') {